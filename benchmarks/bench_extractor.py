@@ -0,0 +1,120 @@
+"""
+Extractor benchmark: per-keyword re-splitting vs per-message segments.
+
+Long Russian 3dnews-style articles, each hit by several keywords.
+
+Run from the repo root:
+    python -m benchmarks.bench_extractor
+"""
+from __future__ import annotations
+
+import random
+import re
+import time
+
+from src.extractor import extract
+from src.matcher import match
+
+
+_WORDS = (
+    "процессор видеокарта память рынок цена снижение рост компания "
+    "производитель поставки спрос дефицит регулятор биржа взлом утечка "
+    "обновление драйвер сервер данные пользователи отчёт квартал прибыль"
+).split()
+
+KEYWORDS = ["взлом", "утечка", "регулятор", "биржа", "дефицит"]
+
+
+def _naive_find_paragraph(text, keyword):
+    paragraphs = re.split(r"\n\s*\n+", text)
+    keyword_lower = keyword.lower()
+    for paragraph in paragraphs:
+        if keyword_lower in paragraph.lower():
+            return paragraph
+    return None
+
+
+def _naive_find_sentence_window(text, keyword):
+    sentences = re.split(r"(?<=[.!?])\s+", text.strip())
+    keyword_lower = keyword.lower()
+    for index, sentence in enumerate(sentences):
+        if keyword_lower in sentence.lower():
+            start = max(index - 1, 0)
+            end = min(index + 1, len(sentences) - 1)
+            return " ".join(sentences[start : end + 1])
+    return None
+
+
+def _naive_extract(messages, keywords):
+    snippets = []
+    for message in messages:
+        text = message.get("text")
+        if not text:
+            continue
+        for keyword in keywords:
+            if keyword.lower() not in text.lower():
+                continue
+            snippet = _naive_find_paragraph(text, keyword)
+            if snippet is None:
+                snippet = _naive_find_sentence_window(text, keyword)
+            if snippet is None:
+                snippet = text
+            snippets.append(
+                {
+                    "post_id": message.get("id"),
+                    "date": message.get("date"),
+                    "url": message.get("url"),
+                    "keyword": keyword,
+                    "snippet": snippet,
+                }
+            )
+    return snippets
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(8, 20))]
+    return " ".join(words).capitalize() + rng.choice([".", ".", "!", "?"])
+
+
+def _article(rng: random.Random, paragraphs: int) -> str:
+    return "\n\n".join(
+        " ".join(_sentence(rng) for _ in range(rng.randint(3, 8)))
+        for _ in range(paragraphs)
+    )
+
+
+def _timed(fn, *args) -> float:
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    rng = random.Random(7)
+
+    print(
+        f"{'paragraphs':>10} {'naive_s':>10} {'segments_s':>11} {'ratio':>7}"
+        f" {'naive_n':>8} {'coalesced_n':>12}"
+    )
+    for paragraphs in (5, 20, 60):
+        messages = [
+            {"id": i, "date": None, "url": f"https://3dnews.ru/{i}/", "text": _article(rng, paragraphs)}
+            for i in range(200)
+        ]
+        matched = match(messages, KEYWORDS, with_hits=True)
+        naive_snippets = _naive_extract(messages, KEYWORDS)
+        snippets = extract(matched, KEYWORDS)
+        assert {(s["post_id"], s["keyword"], s["snippet"]) for s in naive_snippets} == {
+            (s["post_id"], kw, s["snippet"]) for s in snippets for kw in s["keywords"]
+        }
+
+        naive = _timed(_naive_extract, messages, KEYWORDS)
+        segmented = _timed(extract, matched, KEYWORDS)
+        print(
+            f"{paragraphs:>10} {naive:>10.3f} {segmented:>11.3f} {naive / segmented:>7.2f}"
+            f" {len(naive_snippets):>8} {len(snippets):>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
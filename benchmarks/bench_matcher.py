@@ -0,0 +1,64 @@
+"""
+Matcher benchmark: naive per-keyword scan vs compiled automaton.
+
+Run from the repo root:
+    python -m benchmarks.bench_matcher
+"""
+from __future__ import annotations
+
+import random
+import string
+import time
+
+from src.matcher import compile_keywords, match
+
+
+def _naive_match(messages, keywords):
+    lowered_keywords = [keyword.lower() for keyword in keywords]
+    matched = []
+    for message in messages:
+        text = message.get("text")
+        if not text:
+            continue
+        lowered_text = text.lower()
+        for keyword in lowered_keywords:
+            if keyword in lowered_text:
+                matched.append(message)
+                break
+    return matched
+
+
+def _random_word(rng: random.Random, lo: int = 3, hi: int = 10) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(lo, hi)))
+
+
+def _messages(rng: random.Random, count: int, words: int) -> list[dict]:
+    return [
+        {"text": " ".join(_random_word(rng) for _ in range(words))}
+        for _ in range(count)
+    ]
+
+
+def _timed(fn, *args) -> float:
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    rng = random.Random(42)
+    messages = _messages(rng, count=2000, words=120)
+
+    print(f"{'keywords':>8} {'naive_s':>10} {'automaton_s':>12} {'ratio':>7}")
+    for count in (12, 50, 200, 500, 1000):
+        keywords = [_random_word(rng, 6, 12) for _ in range(count)]
+        compile_keywords(tuple(keywords))
+        assert match(messages, keywords) == _naive_match(messages, keywords)
+
+        naive = _timed(_naive_match, messages, keywords)
+        compiled = _timed(match, messages, keywords)
+        print(f"{count:>8} {naive:>10.3f} {compiled:>12.3f} {naive / compiled:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
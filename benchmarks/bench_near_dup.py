@@ -0,0 +1,70 @@
+"""
+Near-duplicate index benchmark: MinHash LSH at 100k snippets.
+
+Builds reposts of base posts with a few words replaced, feeds everything
+through the index and reports throughput, peak RSS growth (Linux) and how many
+reposts were caught / how many distinct posts were wrongly dropped.
+
+Run from the repo root:
+    python -m benchmarks.bench_near_dup [items]
+"""
+from __future__ import annotations
+
+import random
+import resource
+import sys
+import time
+
+from src.storage import NEAR_DUP_THRESHOLD, _NearDuplicateIndex
+
+
+_VOCAB = [f"w{i}" for i in range(20000)]
+
+
+def _post(rng: random.Random) -> list[str]:
+    return [rng.choice(_VOCAB) for _ in range(rng.randint(30, 60))]
+
+
+def _repost(rng: random.Random, words: list[str], changes: int) -> list[str]:
+    words = list(words)
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = rng.choice(_VOCAB)
+    return words
+
+
+def main() -> None:
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(11)
+
+    originals = total // 2
+    texts: list[tuple[str, bool]] = []
+    bases = [_post(rng) for _ in range(originals)]
+    for words in bases:
+        texts.append((" ".join(words), False))
+    for _ in range(total - originals):
+        base = bases[rng.randrange(originals)]
+        texts.append((" ".join(_repost(rng, base, rng.randint(1, 3))), True))
+
+    index = _NearDuplicateIndex(NEAR_DUP_THRESHOLD)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    caught = false_drops = 0
+    for text, is_repost in texts:
+        if index.is_duplicate(text):
+            if is_repost:
+                caught += 1
+            else:
+                false_drops += 1
+    elapsed = time.perf_counter() - started
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(f"items:              {total}")
+    print(f"threshold:          {NEAR_DUP_THRESHOLD}")
+    print(f"seconds:            {elapsed:.2f} ({total / elapsed:,.0f} items/s)")
+    print(f"index peak RSS:     +{(rss_after - rss_before) / 1024:.1f} MiB")
+    print(f"reposts caught:     {caught}/{total - originals}")
+    print(f"originals dropped:  {false_drops}/{originals}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,9 @@ from __future__ import annotations
 
 import json
 import urllib.parse
-import urllib.request
-from typing import Any, Dict, Iterable, List, Optional, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from src.http_transport import get_transport
 
 
 # ----------------------------
@@ -62,6 +63,32 @@ def read_price_snapshots(
     Returns list of api-item v1 dicts (price_snapshot).
     """
 
+    return list(
+        iter_price_snapshots(
+            server=server,
+            item_ids=item_ids,
+            locations=locations,
+            qualities=qualities,
+            timeout_s=timeout_s,
+            user_agent=user_agent,
+        )
+    )
+
+
+def iter_price_snapshots(
+    *,
+    server: str,
+    item_ids: Sequence[str],
+    locations: Sequence[str],
+    qualities: Sequence[int],
+    timeout_s: float = 10.0,
+    user_agent: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming form of read_price_snapshots(): yields records per item_id
+    request as responses arrive.
+    """
+
     _validate_inputs(
         server=server,
         item_ids=item_ids,
@@ -69,8 +96,6 @@ def read_price_snapshots(
         qualities=qualities,
     )
 
-    results: List[Dict[str, Any]] = []
-
     for item_id in item_ids:
         url = _build_prices_url(
             server=server,
@@ -96,14 +121,11 @@ def read_price_snapshots(
             if not isinstance(record, dict):
                 continue
 
-            normalized = _normalize_price_record(
+            yield _normalize_price_record(
                 record=record,
                 server=server,
                 url=url,
             )
-            results.append(normalized)
-
-    return results
 
 
 # ----------------------------
@@ -162,26 +184,23 @@ def _http_get_json(
     if user_agent:
         headers["User-Agent"] = user_agent
 
-    req = urllib.request.Request(url, headers=headers, method="GET")
-
     try:
-        with urllib.request.urlopen(req, timeout=timeout_s) as resp:
-            status = resp.status
-            body = resp.read().decode("utf-8")
+        resp = get_transport().get(url, headers=headers, timeout=timeout_s)
+        status = resp.status
+        body = resp.body.decode("utf-8", errors="ignore" if status >= 400 else "strict")
 
-    except urllib.error.HTTPError as e:
-        snippet = e.read().decode("utf-8", errors="ignore")[:300]
+    except Exception as e:
         raise ApiReaderError(
-            f"HTTP error {e.code}",
+            f"Network error: {e}",
             url=url,
-            status_code=e.code,
-            response_snippet=snippet,
         )
 
-    except Exception as e:
+    if status >= 400:
         raise ApiReaderError(
-            f"Network error: {e}",
+            f"HTTP error {status}",
             url=url,
+            status_code=status,
+            response_snippet=body[:300],
         )
 
     if status < 200 or status >= 300:
@@ -1,60 +1,249 @@
 from __future__ import annotations
 
 import re
-from typing import Dict, List
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
 
+from src.matcher import MatchResult, find_hits
+
+
+_PARAGRAPH_SEP_RE = re.compile(r"\n\s*\n+")
+_SENTENCE_SEP_RE = re.compile(r"(?<=[.!?])\s+")
 
-def _find_paragraph(text: str, keyword: str) -> str | None:
-    paragraphs = re.split(r"\n\s*\n+", text)
-    keyword_lower = keyword.lower()
-    for paragraph in paragraphs:
-        if keyword_lower in paragraph.lower():
-            return paragraph
-    return None
 
+def _boundaries(text: str, separator: re.Pattern, offset: int = 0) -> Tuple[List[int], List[int]]:
+    starts: List[int] = []
+    ends: List[int] = []
+    start = 0
+    for sep in separator.finditer(text):
+        starts.append(offset + start)
+        ends.append(offset + sep.start())
+        start = sep.end()
+    starts.append(offset + start)
+    ends.append(offset + len(text))
+    return starts, ends
 
-def _find_sentence_window(text: str, keyword: str) -> str | None:
-    sentences = re.split(r"(?<=[.!?])\s+", text.strip())
-    keyword_lower = keyword.lower()
-    for index, sentence in enumerate(sentences):
-        if keyword_lower in sentence.lower():
-            start = max(index - 1, 0)
-            end = min(index + 1, len(sentences) - 1)
-            return " ".join(sentences[start : end + 1])
+
+def _segment_index(starts: List[int], ends: List[int], hit: Tuple[int, int]) -> int | None:
+    index = bisect_right(starts, hit[0]) - 1
+    if index >= 0 and hit[1] <= ends[index]:
+        return index
     return None
 
 
-def extract(messages: List[Dict], keywords: List[str]) -> List[Dict]:
+# Snippet window levels: (level, first segment, last segment).
+_PARAGRAPH = 0
+_SENTENCES = 1
+_FULL_TEXT = 2
+
+Window = Tuple[int, int, int]
+
+
+class _Segments:
+    """
+    Paragraph and sentence boundaries of one message, computed once and
+    shared by all keywords that hit it. Sentences are split lazily.
+    """
+
+    __slots__ = ("text", "_paragraphs", "_sentences")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self._paragraphs = _boundaries(text, _PARAGRAPH_SEP_RE)
+        self._sentences: Tuple[List[int], List[int]] | None = None
+
+    def _sentence_boundaries(self) -> Tuple[List[int], List[int]]:
+        if self._sentences is None:
+            offset = len(self.text) - len(self.text.lstrip())
+            self._sentences = _boundaries(self.text.strip(), _SENTENCE_SEP_RE, offset)
+        return self._sentences
+
+    def window(self, hits: List[Tuple[int, int]]) -> Window:
+        """
+        Paragraph holding the first contained hit, else a sentence plus its
+        neighbours, else the whole text.
+        """
+        starts, ends = self._paragraphs
+        for hit in hits:
+            index = _segment_index(starts, ends, hit)
+            if index is not None:
+                return (_PARAGRAPH, index, index)
+
+        starts, ends = self._sentence_boundaries()
+        for hit in hits:
+            index = _segment_index(starts, ends, hit)
+            if index is not None:
+                return (_SENTENCES, max(index - 1, 0), min(index + 1, len(starts) - 1))
+
+        return (_FULL_TEXT, 0, 0)
+
+    def spans(self, window: Window) -> Tuple[Tuple[int, int], ...]:
+        level, first, last = window
+        if level == _PARAGRAPH:
+            starts, ends = self._paragraphs
+            return ((starts[first], ends[first]),)
+        if level == _SENTENCES:
+            starts, ends = self._sentence_boundaries()
+            return tuple((starts[i], ends[i]) for i in range(first, last + 1))
+        return ((0, len(self.text)),)
+
+
+class Snippet:
+    """
+    Snippet record that references the source message text by offsets.
+
+    The snippet string is only materialized on access (storage renders it
+    when serializing), so extraction does not copy text. Supports the
+    dict-style access (item["snippet"], item.get("url")) that storage uses.
+    """
+
+    __slots__ = ("post_id", "date", "url", "keywords", "source", "spans", "importance_score")
+
+    _FIELDS = ("post_id", "date", "url", "keyword", "keywords", "snippet")
+
+    def __init__(
+        self,
+        *,
+        post_id: Any,
+        date: Any,
+        url: Any,
+        keywords: List[str],
+        source: str,
+        spans: Tuple[Tuple[int, int], ...],
+    ) -> None:
+        self.post_id = post_id
+        self.date = date
+        self.url = url
+        self.keywords = keywords
+        self.source = source
+        self.spans = spans
+
+    @property
+    def keyword(self) -> str:
+        return self.keywords[0]
+
+    @property
+    def snippet(self) -> str:
+        if len(self.spans) == 1:
+            start, end = self.spans[0]
+            return self.source[start:end]
+        return " ".join(self.source[start:end] for start, end in self.spans)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._FIELDS or key == "importance_score":
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key != "importance_score":
+            raise KeyError(key)
+        self.importance_score = value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = {key: self[key] for key in self._FIELDS}
+        if hasattr(self, "importance_score"):
+            out["importance_score"] = self.importance_score
+        return out
+
+
+def _window(segments: _Segments, keyword: str, hits: List[Tuple[int, int]]) -> Window:
+    """
+    Window for a keyword given (at least) its first hit. Only when that hit
+    straddles a paragraph boundary are the remaining hits looked up.
+    """
+    window = segments.window(hits)
+    if window[0] != _PARAGRAPH:
+        window = segments.window(find_hits(segments.text, [keyword])[keyword])
+    return window
+
+
+def _coalesce(windows: List[Tuple[Window, str]]) -> List[Tuple[Window, List[str]]]:
+    """
+    Merge identical or overlapping windows of the same level. A merged
+    window takes the place of its earliest keyword; keywords keep input order.
+    """
+    rank = {keyword: index for index, (_, keyword) in enumerate(windows)}
+    merged: List[Tuple[Window, List[str]]] = []
+    for (level, first, last), keyword in windows:
+        keywords = [keyword]
+        position = None
+        kept: List[Tuple[Window, List[str]]] = []
+        for other, other_keywords in merged:
+            if other[0] == level and other[1] <= last and first <= other[2]:
+                first = min(first, other[1])
+                last = max(last, other[2])
+                keywords.extend(other_keywords)
+                if position is None:
+                    position = len(kept)
+                continue
+            kept.append((other, other_keywords))
+        keywords.sort(key=rank.__getitem__)
+        kept.insert(len(kept) if position is None else position, ((level, first, last), keywords))
+        merged = kept
+    return merged
+
+
+def extract(messages: List[Union[Dict, MatchResult]], keywords: List[str]) -> List[Snippet]:
     """
     Extracts paragraph or 1–2 sentences around keyword occurrence.
 
     - Does NOT filter messages
     - Does NOT perform any I/O
-    - Returns list of snippet objects
+    - Accepts plain messages or MatchResult objects from
+      match(..., with_hits=True); hit offsets are reused, not rescanned
+      (unless the first hit straddles a paragraph boundary)
+    - Emits one snippet per distinct window of a message: keywords whose
+      windows coincide or overlap share a record ("keywords" lists them,
+      "keyword" is the first one)
+    - Returns list of Snippet objects (offsets into the message text)
     """
     if not messages or not keywords:
         return []
 
-    snippets: List[Dict] = []
+    return list(iter_extract(messages, keywords))
+
+
+def iter_extract(
+    messages: Iterable[Union[Dict, MatchResult]],
+    keywords: List[str],
+) -> Iterator[Snippet]:
+    """
+    Generator form of extract(): yields snippets message by message.
+    """
+    if not keywords:
+        return
+
     for message in messages:
-        text = message.get("text")
+        if isinstance(message, MatchResult):
+            hits = message.hits
+            message = message.message
+            text = message.get("text")
+        else:
+            text = message.get("text")
+            hits = find_hits(text, keywords, first_only=True) if text else {}
         if not text:
             continue
-        for keyword in keywords:
-            if keyword.lower() not in text.lower():
-                continue
-            snippet = _find_paragraph(text, keyword)
-            if snippet is None:
-                snippet = _find_sentence_window(text, keyword)
-            if snippet is None:
-                snippet = text
-            snippets.append(
-                {
-                    "post_id": message.get("id"),
-                    "date": message.get("date"),
-                    "url": message.get("url"),
-                    "keyword": keyword,
-                    "snippet": snippet,
-                }
+        segments = _Segments(text)
+        windows = [
+            (_window(segments, keyword, hits[keyword]), keyword)
+            for keyword in keywords
+            if hits.get(keyword)
+        ]
+        for window, window_keywords in _coalesce(windows):
+            yield Snippet(
+                post_id=message.get("id"),
+                date=message.get("date"),
+                url=message.get("url"),
+                keywords=window_keywords,
+                source=text,
+                spans=segments.spans(window),
             )
-    return snippets
@@ -1,14 +1,24 @@
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Dict, Iterable, Iterator
 import yaml
 
-from src.extractor import extract
-from src.matcher import match
+from src.extractor import iter_extract
+from src.http_transport import get_transport
+from src.matcher import iter_match
+from src.paths import ARTICLE_CACHE_DIR, SEEN_STORE_PATH, TELEGRAM_STATE_PATH, WEB_STATE_PATH
 from src.status import mark_done, mark_error, mark_running, write_task_snapshot
-from src.storage import save
-from src.tg_reader import read_messages
-from src.web_reader import read_site_items
-from src.api_reader import read_price_snapshots
+from src.storage import SeenStore, keyword_scope, save
+from src.tg_reader import (
+    DEFAULT_CACHE_TTL_HOURS,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_DEADLINE_SECONDS,
+    ENTITY_CACHE_PATH,
+    iter_messages,
+)
+from src.web_reader import iter_site_items
+from src.web_store import ArticleCache
+from src.api_reader import iter_price_snapshots
 from src.validation_v1 import validate_task_yaml_v1, TaskYamlError
 
 
@@ -25,42 +35,65 @@ def _load_yaml(path: Path) -> dict:
     return data
 
 
-def _collect_items_from_sources(
+def _counted(items: Iterable, stats: Dict[str, int], key: str) -> Iterator:
+    for item in items:
+        stats[key] += 1
+        yield item
+
+
+def _iter_items_from_sources(
     sources: list,
     since: datetime,
     lookback_hours: int,
-) -> list:
+    telegram_report: dict | None = None,
+    keywords: list | None = None,
+    article_cache: ArticleCache | None = None,
+) -> Iterator[dict]:
     """
     v1 contract:
       sources: list of blocks
-        - {type: telegram, channels: [...], limit_per_channel?: int}
+        - {type: telegram, channels: [...], limit_per_channel?: int, concurrency?: int,
+           cache_ttl_hours?: int, cache_max_age_minutes?: int, deadline_seconds?: int,
+           mode?: history|search}
         - {type: web, sites: [...]}
         - {type: api, provider: str, dataset: str, server?: str, items?: {...}, locations?: [...]}
+
+    Items are yielded as each reader produces them. Telegram channels
+    deferred or dropped on FloodWait and per-session request counts are
+    collected in telegram_report.
     """
-    items: list = []
 
     for src in sources:
         stype = src["type"]
 
         # --- telegram ---
         if stype == "telegram":
-            tg_messages = read_messages(
+            yield from iter_messages(
                 channels=src["channels"],
                 since=since,
                 until=None,
                 limit_per_channel=src.get("limit_per_channel", 200),
+                concurrency=src.get("concurrency", DEFAULT_CONCURRENCY),
+                state_path=TELEGRAM_STATE_PATH,
+                cache_ttl_hours=src.get("cache_ttl_hours", DEFAULT_CACHE_TTL_HOURS),
+                cache_max_age_minutes=src.get("cache_max_age_minutes", 0),
+                entity_cache_path=ENTITY_CACHE_PATH,
+                deadline_seconds=src.get("deadline_seconds", DEFAULT_DEADLINE_SECONDS),
+                report=telegram_report,
+                mode=src.get("mode", "history"),
+                keywords=keywords,
             )
-            items.extend(tg_messages)
             continue
 
         # --- web ---
         if stype == "web":
             for site in src["sites"]:
-                site_items = read_site_items(
+                yield from iter_site_items(
                     site=site,
                     lookback_hours=lookback_hours,
+                    state_path=WEB_STATE_PATH,
+                    article_cache=article_cache,
                 )
-                items.extend(site_items)
             continue
 
         # --- api ---
@@ -70,13 +103,12 @@ def _collect_items_from_sources(
             server = src.get("server", "west")
 
             if provider == "albion" and dataset == "market_snapshot":
-                api_items = read_price_snapshots(
+                yield from iter_price_snapshots(
                     server=server,
                     item_ids=src.get("items", []),
                     locations=src.get("locations", []),
                     qualities=src.get("qualities", []),
                 )
-                items.extend(api_items)
                 continue
 
             raise RuntimeError(
@@ -85,8 +117,6 @@ def _collect_items_from_sources(
 
         raise RuntimeError(f"Unsupported source type: {stype}")
 
-    return items
-
 
 def main() -> None:
     started_at = None
@@ -145,6 +175,8 @@ def main() -> None:
 
         limits = cfg.get("limits", {})
         max_items = limits.get("max_items")
+        near_dup_threshold = limits.get("near_dup_threshold")
+        raw_format = cfg.get("output", {}).get("raw_format", "json")
 
         sources = cfg["sources"]  # v1: list[dict]
         # --- inject minimal api context (v1 glue) ---
@@ -175,30 +207,50 @@ def main() -> None:
         now = datetime.now(timezone.utc)
         since = now - timedelta(hours=lookback_hours)
 
-        items = _collect_items_from_sources(
-            sources=sources,
-            since=since,
-            lookback_hours=lookback_hours,
-        )
+        # --- pipeline (streaming: readers -> match -> seen -> extract -> save) ---
+        stats = {"items_read": 0, "matched": 0, "already_seen": 0, "snippets": 0}
+        telegram_report = {"deferred": [], "dropped": [], "sessions": {}}
+        article_cache = ArticleCache(ARTICLE_CACHE_DIR)
 
-        # --- pipeline ---
-        matched = match(items, keywords)
-        extracted = extract(matched, keywords)
-
-        save(
-            extracted,
-            output_dir="output",
+        seen = SeenStore(
+            SEEN_STORE_PATH,
             lookback_hours=lookback_hours,
-            max_items=max_items,
+            now=now,
+            scope=keyword_scope(keywords),
         )
+        try:
+            items = _iter_items_from_sources(
+                sources=sources,
+                since=since,
+                lookback_hours=lookback_hours,
+                telegram_report=telegram_report,
+                keywords=keywords,
+                article_cache=article_cache,
+            )
+            matched = iter_match(_counted(items, stats, "items_read"), keywords, with_hits=True)
+            fresh = seen.filter(_counted(matched, stats, "matched"))
+            extracted = iter_extract(fresh, keywords)
+
+            reported = save(
+                _counted(extracted, stats, "snippets"),
+                output_dir="output",
+                lookback_hours=lookback_hours,
+                max_items=max_items,
+                include_keywords=keywords,
+                raw_format=raw_format,
+                near_dup_threshold=near_dup_threshold,
+            )
+            seen.commit(reported)
+            stats["already_seen"] = seen.skipped
+            stats["telegram"] = telegram_report
+            stats["http"] = get_transport().counters()
+            stats["article_cache"] = article_cache.counters()
+        finally:
+            seen.close()
 
         mark_done(
             started_at=started_at,
-            stats={
-                "items_read": len(items),
-                "matched": len(matched),
-                "snippets": len(extracted),
-            },
+            stats=stats,
             result_path=result_path,
         )
         from src.human_output.summary import emit_success_summary
@@ -1,7 +1,229 @@
-from typing import List, Dict
+from __future__ import annotations
 
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-def match(messages: List[Dict], keywords: List[str]) -> List[Dict]:
+
+# Below this many keywords a C-level substring scan per keyword is faster
+# than walking the automaton character by character in Python.
+AUTOMATON_MIN_KEYWORDS = 128
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over lowered keywords.
+
+    Built once per keyword set, then applied to each lowered text in a
+    single left-to-right pass regardless of the number of keywords.
+    Small keyword sets are scanned with str containment instead.
+    """
+
+    __slots__ = ("keywords", "_delta", "_out", "_match_empty")
+
+    def __init__(self, keywords: Tuple[str, ...]) -> None:
+        self.keywords = keywords
+        self._match_empty = any(not keyword for keyword in keywords)
+
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for index, keyword in enumerate(keywords):
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][char] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(index)
+
+        # BFS: failure links, then a dense transition table per state so
+        # that scanning never has to follow failure links at runtime.
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{}] * (len(goto) - 1)
+        queue = list(goto[0].values())
+        for state in queue:
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for char, nxt in goto[state].items():
+                queue.append(nxt)
+                fail[nxt] = delta[fail[state]].get(char, 0)
+                outputs[nxt].extend(outputs[fail[nxt]])
+
+        self._delta = delta
+        self._out = [tuple(o) for o in outputs]
+
+    def search(self, lowered_text: str) -> bool:
+        if self._match_empty:
+            return True
+        if len(self.keywords) < AUTOMATON_MIN_KEYWORDS:
+            for keyword in self.keywords:
+                if keyword in lowered_text:
+                    return True
+            return False
+        delta = self._delta
+        out = self._out
+        state = 0
+        for char in lowered_text:
+            state = delta[state].get(char, 0)
+            if out[state]:
+                return True
+        return False
+
+    def find_all(self, lowered_text: str) -> List[List[int]]:
+        """
+        Start offsets of every (possibly overlapping) occurrence of each
+        keyword in lowered_text, indexed like self.keywords.
+        """
+        starts: List[List[int]] = [[] for _ in self.keywords]
+        if len(self.keywords) < AUTOMATON_MIN_KEYWORDS:
+            for index, keyword in enumerate(self.keywords):
+                if not keyword:
+                    starts[index].append(0)
+                    continue
+                pos = lowered_text.find(keyword)
+                while pos != -1:
+                    starts[index].append(pos)
+                    pos = lowered_text.find(keyword, pos + 1)
+            return starts
+
+        for index, keyword in enumerate(self.keywords):
+            if not keyword:
+                starts[index].append(0)
+        delta = self._delta
+        out = self._out
+        keywords = self.keywords
+        state = 0
+        for pos, char in enumerate(lowered_text, start=1):
+            state = delta[state].get(char, 0)
+            for index in out[state]:
+                starts[index].append(pos - len(keywords[index]))
+        return starts
+
+    def find_first(self, lowered_text: str) -> List[int]:
+        """
+        Start offset of the first occurrence of each keyword in
+        lowered_text (-1 if absent), indexed like self.keywords.
+        """
+        if len(self.keywords) < AUTOMATON_MIN_KEYWORDS:
+            return [lowered_text.find(keyword) for keyword in self.keywords]
+
+        first = [0 if not keyword else -1 for keyword in self.keywords]
+        missing = first.count(-1)
+        delta = self._delta
+        out = self._out
+        keywords = self.keywords
+        state = 0
+        for pos, char in enumerate(lowered_text, start=1):
+            state = delta[state].get(char, 0)
+            for index in out[state]:
+                if first[index] == -1:
+                    first[index] = pos - len(keywords[index])
+                    missing -= 1
+            if not missing:
+                break
+        return first
+
+
+class MatchResult:
+    """
+    A matched message plus where each keyword hit it.
+
+    hits maps keyword (as given) -> sorted (start, end) offsets into
+    message["text"]; match() records only the first hit of each keyword.
+    Keywords without hits are absent.
+    """
+
+    __slots__ = ("message", "hits")
+
+    def __init__(self, message: Dict, hits: Dict[str, List[Tuple[int, int]]]) -> None:
+        self.message = message
+        self.hits = hits
+
+
+def _lowered_index(text: str, lowered_text: str) -> Optional[List[int]]:
+    """
+    str.lower() can change length (e.g. "İ"); map lowered offsets back to
+    original ones. None when lengths agree and offsets are identical.
+    """
+    if len(text) == len(lowered_text):
+        return None
+    starts: List[int] = []
+    pos = 0
+    for char in text:
+        starts.append(pos)
+        pos += len(char.lower())
+    return starts
+
+
+@lru_cache(maxsize=32)
+def compile_keywords(keywords: Tuple[str, ...]) -> KeywordAutomaton:
+    return KeywordAutomaton(tuple(keyword.lower() for keyword in keywords))
+
+
+def _offsets(
+    text: str,
+    lowered_text: str,
+    keywords: List[str],
+    automaton: KeywordAutomaton,
+    found: List[List[int]],
+) -> Dict[str, List[Tuple[int, int]]]:
+    index = _lowered_index(text, lowered_text)
+    hits: Dict[str, List[Tuple[int, int]]] = {}
+    for keyword, lowered_keyword, starts in zip(keywords, automaton.keywords, found):
+        if not starts or keyword in hits:
+            continue
+        size = len(lowered_keyword)
+        if index is None:
+            hits[keyword] = [(start, start + size) for start in starts]
+        else:
+            hits[keyword] = [
+                (bisect_right(index, start) - 1, bisect_left(index, start + size))
+                for start in starts
+            ]
+    return hits
+
+
+def _first_offsets(
+    text: str,
+    lowered_text: str,
+    keywords: List[str],
+    automaton: KeywordAutomaton,
+) -> Dict[str, List[Tuple[int, int]]]:
+    found = [[start] if start != -1 else [] for start in automaton.find_first(lowered_text)]
+    return _offsets(text, lowered_text, keywords, automaton, found)
+
+
+def find_hits(
+    text: str,
+    keywords: List[str],
+    *,
+    first_only: bool = False,
+) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Case-insensitive keyword hits in text as keyword -> [(start, end), ...].
+    first_only keeps just the first hit of each keyword (one find per
+    keyword instead of collecting every occurrence).
+    """
+    if not text or not keywords:
+        return {}
+
+    automaton = compile_keywords(tuple(keywords))
+    lowered_text = text.lower()
+    if first_only:
+        return _first_offsets(text, lowered_text, keywords, automaton)
+    return _offsets(text, lowered_text, keywords, automaton, automaton.find_all(lowered_text))
+
+
+def match(
+    messages: List[Dict],
+    keywords: List[str],
+    *,
+    with_hits: bool = False,
+) -> Union[List[Dict], List[MatchResult]]:
     """
     Returns messages containing at least one keyword (case-insensitive).
 
@@ -19,6 +241,11 @@ def match(messages: List[Dict], keywords: List[str]) -> List[Dict]:
     - If messages is empty or keywords is empty, return an empty list.
     - If a message has no "text" field or empty text, it should not match.
     - Matching stops on the first keyword match per message.
+    - Keywords are compiled once into a KeywordAutomaton (Aho-Corasick),
+      so each message is scanned in a single pass.
+    - with_hits=True returns MatchResult objects (message + offset of the
+      first hit of each keyword) instead of bare messages, so extract()
+      does not have to search the text again.
 
     Constraints:
     - One responsibility only.
@@ -29,17 +256,32 @@ def match(messages: List[Dict], keywords: List[str]) -> List[Dict]:
     if not messages or not keywords:
         return []
 
-    lowered_keywords = [keyword.lower() for keyword in keywords]
-    matched_messages = []
+    return list(iter_match(messages, keywords, with_hits=with_hits))
+
+
+def iter_match(
+    messages: Iterable[Dict],
+    keywords: List[str],
+    *,
+    with_hits: bool = False,
+) -> Iterator[Union[Dict, MatchResult]]:
+    """
+    Generator form of match(): same rules, yields matches as messages
+    arrive so the pipeline can stream.
+    """
+    if not keywords:
+        return
+
+    automaton = compile_keywords(tuple(keywords))
 
     for message in messages:
         text = message.get("text")
         if not text:
             continue
         lowered_text = text.lower()
-        for keyword in lowered_keywords:
-            if keyword in lowered_text:
-                matched_messages.append(message)
-                break
-
-    return matched_messages
+        if not automaton.search(lowered_text):
+            continue
+        if with_hits:
+            yield MatchResult(message, _first_offsets(text, lowered_text, keywords, automaton))
+        else:
+            yield message
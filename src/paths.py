@@ -0,0 +1,10 @@
+from pathlib import Path
+
+
+# Persistent state shared by the batch pipeline (main) and the live listener.
+
+# Cross-run dedup state (items already reported by earlier runs).
+SEEN_STORE_PATH = Path("runtime/state/seen.sqlite3")
+TELEGRAM_STATE_PATH = Path("runtime/state/telegram.sqlite3")
+WEB_STATE_PATH = Path("runtime/state/web.sqlite3")
+ARTICLE_CACHE_DIR = Path("runtime/state/articles")
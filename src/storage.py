@@ -1,27 +1,89 @@
 from __future__ import annotations
 
 import json
+import os
 import re
 import hashlib
-from datetime import datetime, timezone
+import heapq
+import sqlite3
+from array import array
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import IO, Iterable, Iterator
+
+from src.matcher import AUTOMATON_MIN_KEYWORDS, MatchResult, compile_keywords
 
 
 # =========================
 # helpers (existing)
 # =========================
 
-def _json_safe(value):
+def _json_default(value):
     """
-    Recursively convert values to JSON-serializable types.
+    json encoder hook for values json can't encode natively; nested
+    structures are handled by the encoder itself, without copying.
     """
-    if isinstance(value, dict):
-        return {k: _json_safe(v) for k, v in value.items()}
-    if isinstance(value, list):
-        return [_json_safe(v) for v in value]
     if isinstance(value, datetime):
         return value.isoformat() + "Z"
-    return value
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+RAW_FORMATS = ("json", "ndjson")
+
+
+class _RawWriter:
+    """
+    Incremental raw output: encodes and writes one record at a time.
+
+    json   - raw.json, a JSON array laid out exactly like json.dumps(indent=2);
+             written to raw.json.tmp and only moved into place by publish(),
+             so a failed run leaves the previous raw.json untouched
+    ndjson - raw.ndjson, one compact record per line, flushed per record so
+             downstream tools can tail it
+    """
+
+    def __init__(self, output_path: Path, raw_format: str = "json") -> None:
+        if raw_format not in RAW_FORMATS:
+            raise ValueError(f"Unknown raw_format: {raw_format}")
+        self.raw_format = raw_format
+        self.count = 0
+        if raw_format == "ndjson":
+            self._encoder = json.JSONEncoder(ensure_ascii=False, default=_json_default)
+            self.path = output_path / "raw.ndjson"
+            self._tmp_path = self.path
+        else:
+            self._encoder = json.JSONEncoder(ensure_ascii=False, indent=2, default=_json_default)
+            self.path = output_path / "raw.json"
+            self._tmp_path = output_path / "raw.json.tmp"
+        self._file: IO[str] = self._tmp_path.open("w", encoding="utf-8")
+
+    def write(self, item) -> None:
+        record = self._encoder.encode(item)
+        if self.raw_format == "ndjson":
+            self._file.write(record + "\n")
+            self._file.flush()
+        else:
+            # JSON strings never contain raw newlines, so this nests the
+            # record one level deep exactly as the array encoder would.
+            self._file.write(",\n  " if self.count else "[\n  ")
+            self._file.write(record.replace("\n", "\n  "))
+        self.count += 1
+
+    def close(self) -> None:
+        if self.raw_format == "json":
+            self._file.write("\n]" if self.count else "[]")
+        self._file.close()
+
+    def publish(self) -> None:
+        if self._tmp_path != self.path:
+            os.replace(self._tmp_path, self.path)
+
+    def discard(self) -> None:
+        self._file.close()
+        if self._tmp_path != self.path:
+            self._tmp_path.unlink(missing_ok=True)
 
 
 def _get_field(item: dict, key: str) -> str:
@@ -61,19 +123,45 @@ def _text_fingerprint(text: str) -> str:
     return hashlib.sha1(norm.encode("utf-8")).hexdigest()
 
 
+_LINE_BREAK_RE = re.compile("[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
 def _compute_importance(item: dict, include_keywords: list[str], now: datetime) -> int:
     score = 0
     text = item["snippet"].lower()
 
-    # 1. keyword matches (full text)
-    for kw in include_keywords:
-        score += text.count(kw.lower())
-
-    # 2. keyword in first line
-    first_line = item["snippet"].splitlines()[0].lower() if item["snippet"] else ""
-    for kw in include_keywords:
-        if kw.lower() in first_line:
-            score += 2
+    if len(include_keywords) < AUTOMATON_MIN_KEYWORDS:
+        # few keywords: C-level count / containment per keyword is cheaper
+        first_line = item["snippet"].splitlines()[0].lower() if item["snippet"] else ""
+        for kw in include_keywords:
+            kw = kw.lower()
+            # 1. keyword matches (full text)
+            score += text.count(kw)
+            # 2. keyword in first line
+            if kw in first_line:
+                score += 2
+    else:
+        # many keywords: one automaton scan yields every keyword hit
+        line_break = _LINE_BREAK_RE.search(text)
+        first_line_end = line_break.start() if line_break else len(text)
+        automaton = compile_keywords(tuple(include_keywords))
+        for kw, starts in zip(automaton.keywords, automaton.find_all(text)):
+            if not kw:
+                score += len(text) + 1 + 2
+                continue
+            if not starts:
+                continue
+
+            # 1. keyword matches (full text), non-overlapping like str.count
+            next_free = 0
+            for start in starts:
+                if start >= next_free:
+                    score += 1
+                    next_free = start + len(kw)
+
+            # 2. keyword in first line
+            if starts[0] + len(kw) <= first_line_end:
+                score += 2
 
     # 3. length heuristic
     l = len(item["snippet"])
@@ -92,50 +180,310 @@ def _compute_importance(item: dict, include_keywords: list[str], now: datetime)
     return score
 
 
-def _prepare_items(
-    snippets: list[dict],
-    *,
-    include_keywords: list[str],
-    max_items: int,
-) -> list[dict]:
-    now = datetime.now(timezone.utc)
+# near-duplicate detection: one-permutation MinHash over word shingles,
+# banded into LSH buckets so each item is compared with a few candidates.
+# Opt-in (save(near_dup_threshold=...), task.yaml limits.near_dup_threshold);
+# this is the suggested threshold.
+NEAR_DUP_THRESHOLD = 0.7
+_SHINGLE_WORDS = 2
+_MINHASH_BINS = 32
+_EMPTY_BIN = 0xFFFFFFFF
 
-    # --- URL dedup ---
-    seen_urls: set[str] = set()
-    tmp: list[dict] = []
-    for item in snippets:
-        url = item.get("url")
-        if not url or url in seen_urls:
+
+def _minhash(text: str) -> array | None:
+    words = _normalize_text(text).split()
+    if not words:
+        return None
+
+    if len(words) < _SHINGLE_WORDS:
+        shingles = [" ".join(words)]
+    else:
+        shingles = map(" ".join, zip(*(words[i:] for i in range(_SHINGLE_WORDS))))
+
+    signature = [_EMPTY_BIN] * _MINHASH_BINS
+    blake2b = hashlib.blake2b
+    for shingle in shingles:
+        h = int.from_bytes(blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        slot = h % _MINHASH_BINS
+        value = (h >> 32) % _EMPTY_BIN
+        if value < signature[slot]:
+            signature[slot] = value
+    return array("I", signature)
+
+
+def _minhash_similarity(a: array, b: array) -> float:
+    """
+    Jaccard estimate: agreeing bins over bins non-empty in either signature.
+    """
+    matches = 0
+    used = 0
+    for x, y in zip(a, b):
+        if x == _EMPTY_BIN and y == _EMPTY_BIN:
             continue
-        seen_urls.add(url)
-        tmp.append(item)
+        used += 1
+        if x == y:
+            matches += 1
+    return matches / used if used else 1.0
+
+
+def _lsh_rows(threshold: float) -> int:
+    """
+    Rows per band: the largest r (dividing the bin count) whose LSH
+    threshold (1/b)^(1/r) stays below the similarity threshold, so true
+    near-duplicates collide with high probability.
+    """
+    rows = 1
+    for r in (2, 4, 8, 16):
+        bands = _MINHASH_BINS // r
+        if (1 / bands) ** (1 / r) <= threshold - 0.1:
+            rows = r
+    return rows
+
+
+class _NearDuplicateIndex:
+    """
+    MinHash LSH index. is_duplicate() reports whether a text is at least
+    `threshold` similar (estimated Jaccard over word shingles) to an
+    indexed one, and indexes it otherwise.
+    """
+
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+        self._rows = _lsh_rows(threshold)
+        self._signatures: list[array] = []
+        self._buckets: dict[bytes, list[int]] = {}
+
+    def _band_keys(self, signature: array) -> list[bytes]:
+        keys = []
+        rows = self._rows
+        for band in range(_MINHASH_BINS // rows):
+            chunk = signature[band * rows : (band + 1) * rows]
+            if chunk.count(_EMPTY_BIN) == rows:
+                continue
+            keys.append(bytes([band]) + chunk.tobytes())
+        return keys
+
+    def is_duplicate(self, text: str) -> bool:
+        signature = _minhash(text)
+        if signature is None:
+            return False
+
+        keys = self._band_keys(signature)
+        checked: set[int] = set()
+        for key in keys:
+            for candidate in self._buckets.get(key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                if _minhash_similarity(signature, self._signatures[candidate]) >= self.threshold:
+                    return True
+
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        for key in keys:
+            self._buckets.setdefault(key, []).append(index)
+        return False
+
+
+class _ResultItems:
+    """
+    Incremental URL/text dedup, scoring and bounded top-k selection.
+
+    Optionally drops near-duplicates of earlier items (MinHash LSH).
+    Items are fed one at a time and kept in a min-heap of at most
+    max_items entries keyed by (importance_score, date, -arrival), so the
+    result equals a stable full sort by (importance_score, date)
+    descending: on ties the earlier item wins. O(n log k).
+    """
+
+    def __init__(
+        self,
+        *,
+        include_keywords: list[str],
+        max_items: int | None,
+        now: datetime,
+        near_dup_threshold: float | None = None,
+    ) -> None:
+        self.include_keywords = include_keywords
+        self.max_items = max_items
+        self.now = now
+        self._seen_urls: set[str] = set()
+        self._seen_fp: set[str] = set()
+        self._near_dups = (
+            _NearDuplicateIndex(near_dup_threshold) if near_dup_threshold is not None else None
+        )
+        self._heap: list[tuple] = []
+        self._arrival = 0
+
+    def add(self, item: dict) -> None:
+        # --- URL dedup ---
+        url = item.get("url")
+        if not url or url in self._seen_urls:
+            return
+        self._seen_urls.add(url)
 
-    # --- text dedup ---
-    seen_fp: set[str] = set()
-    deduped: list[dict] = []
-    for item in tmp:
+        # --- text dedup ---
         fp = _text_fingerprint(item.get("snippet", ""))
-        if fp in seen_fp:
-            continue
-        seen_fp.add(fp)
-        deduped.append(item)
+        if fp in self._seen_fp:
+            return
+        self._seen_fp.add(fp)
+
+        # --- near-duplicate dedup (reposts differing by a few words) ---
+        if self._near_dups is not None and self._near_dups.is_duplicate(item.get("snippet", "")):
+            return
 
-    # --- compute importance_score ---
-    for item in deduped:
+        # --- compute importance_score ---
         item["importance_score"] = _compute_importance(
             item,
-            include_keywords=include_keywords,
-            now=now,
+            include_keywords=self.include_keywords,
+            now=self.now,
         )
 
-    # --- sort ---
-    deduped.sort(
-        key=lambda x: (x["importance_score"], x["date"]),
-        reverse=True,
+        # --- bounded top-k ---
+        if self.max_items is not None and self.max_items <= 0:
+            return
+        self._arrival += 1
+        entry = (item["importance_score"], item["date"], -self._arrival, item)
+        if self.max_items is None or len(self._heap) < self.max_items:
+            heapq.heappush(self._heap, entry)
+        elif entry[:3] > self._heap[0][:3]:
+            heapq.heapreplace(self._heap, entry)
+
+    def result(self) -> list[dict]:
+        # --- sort + limit ---
+        return [entry[3] for entry in sorted(self._heap, key=lambda e: e[:3], reverse=True)]
+
+
+def _prepare_items(
+    snippets: Iterable[dict],
+    *,
+    include_keywords: list[str],
+    max_items: int,
+    near_dup_threshold: float | None = None,
+) -> list[dict]:
+    collector = _ResultItems(
+        include_keywords=include_keywords,
+        max_items=max_items,
+        now=datetime.now(timezone.utc),
+        near_dup_threshold=near_dup_threshold,
+    )
+    for item in snippets:
+        collector.add(item)
+    return collector.result()
+
+
+def _include_keywords(snippets: Iterable[dict]) -> list[str]:
+    return sorted(
+        {
+            kw.lower()
+            for item in snippets
+            for kw in (item.get("keywords") or [item.get("keyword")])
+            if kw
+        }
     )
 
-    # --- limit ---
-    return deduped[:max_items]
+
+# =========================
+# cross-run dedup store
+# =========================
+
+def keyword_scope(keywords: Iterable[str]) -> str:
+    """
+    Short stable hash of a keyword set (case-insensitive, order-free),
+    used to scope SeenStore keys to the task's keywords.
+    """
+    norm = "\n".join(sorted({kw.lower() for kw in keywords if kw}))
+    return hashlib.sha1(norm.encode("utf-8")).hexdigest()[:16]
+
+
+class SeenStore:
+    """
+    Persistent record of items reported (rendered into result.md) by
+    earlier runs, keyed by URL and by normalized text fingerprint (SQLite).
+
+    Keys are prefixed with `scope` (see keyword_scope()), so a rerun with
+    a different keyword set does not inherit the old set's history.
+    Entries expire once the item's date falls out of the lookback window,
+    since such items can no longer be read again. Messages passed through
+    filter() are staged, and only those with a reported item are persisted
+    by commit(): unreported or failed-run items come back next run.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        lookback_hours: int,
+        now: datetime | None = None,
+        scope: str = "",
+    ) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.now = now or datetime.now(timezone.utc)
+        self.scope = scope
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY, item_at REAL NOT NULL)"
+        )
+        cutoff = self.now - timedelta(hours=lookback_hours)
+        self._conn.execute("DELETE FROM seen WHERE item_at < ?", (cutoff.timestamp(),))
+        self._conn.commit()
+        self._staged: dict[str, tuple[list[str], float]] = {}   # url -> (keys, item_at)
+        self.skipped = 0
+
+    def _keys(self, message: dict) -> list[str]:
+        keys = [f"fp:{_text_fingerprint(message.get('text') or '')}"]
+        url = message.get("url")
+        if url:
+            keys.append(f"url:{url}")
+        if self.scope:
+            keys = [f"{self.scope}:{key}" for key in keys]
+        return keys
+
+    def _seen(self, keys: list[str]) -> bool:
+        placeholders = ",".join("?" * len(keys))
+        row = self._conn.execute(
+            f"SELECT 1 FROM seen WHERE key IN ({placeholders}) LIMIT 1", keys
+        ).fetchone()
+        return row is not None
+
+    def filter(self, messages: Iterable) -> Iterator:
+        """
+        Drops messages (or MatchResults) reported in a previous run; stages
+        the rest (by URL) for commit().
+        """
+        for item in messages:
+            message = item.message if isinstance(item, MatchResult) else item
+            keys = self._keys(message)
+            if self._seen(keys):
+                self.skipped += 1
+                continue
+            url = message.get("url")
+            if url:
+                date = message.get("date")
+                item_at = (date if isinstance(date, datetime) else self.now).timestamp()
+                self._staged[url] = (keys, item_at)
+            yield item
+
+    def commit(self, reported: Iterable[dict]) -> None:
+        """
+        Persists the staged messages whose URL has an item in `reported`
+        (what save() rendered); the rest of the staged keys are dropped.
+        """
+        rows: list[tuple[str, float]] = []
+        for item in reported:
+            staged = self._staged.pop(item.get("url"), None)
+            if staged is not None:
+                keys, item_at = staged
+                rows.extend((key, item_at) for key in keys)
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO seen (key, item_at) VALUES (?, ?)",
+            rows,
+        )
+        self._conn.commit()
+        self._staged.clear()
+
+    def close(self) -> None:
+        self._conn.close()
 
 
 # =========================
@@ -143,32 +491,65 @@ def _prepare_items(
 # =========================
 
 def save(
-    snippets: list[dict],
+    snippets: Iterable[dict],
     output_dir: str,
     *,
     lookback_hours: int,
     max_items: int,
-) -> None:
+    include_keywords: list[str] | None = None,
+    raw_format: str = "json",
+    near_dup_threshold: float | None = None,
+) -> list[dict]:
+    """
+    Writes raw.json (or raw.ndjson) and result.md from snippets, consuming
+    them once. Returns the items rendered into result.md.
+
+    snippets may be fed by live readers; if iterating them raises, result.md
+    and raw.json are left as the previous run wrote them (raw.ndjson, meant
+    to be tailed, holds the records written so far).
+
+    With include_keywords (the task keywords) snippets may be a generator:
+    raw.json is written record by record and only the top max_items are
+    kept for result.md. Without it the scoring keywords are derived from
+    the snippets themselves, which requires materializing them first.
+
+    near_dup_threshold (estimated Jaccard over word shingles, 0..1] drops
+    result items that are near-duplicates of an earlier one; None (the
+    default) disables it. raw output always keeps every snippet.
+    """
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
-    # --- raw.json (machine-readable, JSON-safe) ---
-    (output_path / "raw.json").write_text(
-        json.dumps(_json_safe(snippets), ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
+    if include_keywords is None:
+        snippets = list(snippets)
+        include_keywords = _include_keywords(snippets)
+    else:
+        include_keywords = sorted({kw.lower() for kw in include_keywords if kw})
 
-    # --- prepare result items ---
-    include_keywords = sorted(
-        {item.get("keyword", "").lower() for item in snippets if item.get("keyword")}
-    )
+    if near_dup_threshold is not None and not 0 < near_dup_threshold <= 1:
+        raise ValueError("near_dup_threshold must be in (0, 1]")
 
-    items = _prepare_items(
-        snippets,
+    collector = _ResultItems(
         include_keywords=include_keywords,
         max_items=max_items,
+        now=datetime.now(timezone.utc),
+        near_dup_threshold=near_dup_threshold,
     )
 
+    # --- raw.json / raw.ndjson (machine-readable), streamed per record ---
+    raw = _RawWriter(output_path, raw_format)
+    try:
+        for item in snippets:
+            raw.write(item)
+            collector.add(item)
+        raw.close()
+    except BaseException:
+        raw.discard()
+        raise
+
+    # --- prepare result items ---
+    items = collector.result()
+
     # --- result.md (human-readable) ---
     generated_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M")
 
@@ -215,7 +596,14 @@ def save(
                 ]
             )
 
-    (output_path / "result.md").write_text(
-        "\n".join(lines).rstrip() + "\n",
-        encoding="utf-8",
-    )
+    try:
+        (output_path / "result.md").write_text(
+            "\n".join(lines).rstrip() + "\n",
+            encoding="utf-8",
+        )
+    except BaseException:
+        raw.discard()
+        raise
+    raw.publish()
+
+    return items
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List
+import asyncio
+import sys
+
+import yaml
+from telethon import events
+
+from src.extractor import Snippet, iter_extract
+from src.matcher import iter_match
+from src.paths import TELEGRAM_STATE_PATH
+from src.status import mark_running, write_status
+from src.storage import save
+from src.tg_reader import (
+    DEFAULT_CACHE_TTL_HOURS,
+    _as_aware_utc,
+    _get_client,
+    _normalize_channel,
+    _to_item,
+)
+from src.tg_store import TelegramStore
+from src.validation_v1 import validate_task_yaml_v1
+
+
+# ============================================================
+# Configuration
+# ============================================================
+
+# result.md / status.json are rewritten at most this often while messages arrive.
+DEFAULT_DEBOUNCE_SECONDS = 5.0
+
+
+# ============================================================
+# Listener
+# ============================================================
+
+class LiveListener:
+    """
+    Long-running Telegram mode: NewMessage updates for the configured
+    channels go straight through match() and extract() instead of waiting
+    for the next polling run.
+
+    - New messages are persisted in the TelegramStore (the same message
+      cache tg_reader uses), snippets are kept for the lookback window
+    - On start the window is seeded from messages already in the store
+    - result.md (via storage.save) and status.json are refreshed once per
+      debounce interval after new snippets arrive, not per message
+    - Updates are attributed to the configured channel name (chat ids are
+      resolved once on start), so stored messages share the polling
+      reader's TelegramStore keys and t.me links
+    - No SeenStore filtering: result.md always shows the whole live window
+    """
+
+    def __init__(
+        self,
+        client,
+        *,
+        channels: List[str],
+        keywords: List[str],
+        lookback_hours: int,
+        max_items: int | None,
+        store: TelegramStore,
+        output_dir: str = "output",
+        debounce_seconds: float = DEFAULT_DEBOUNCE_SECONDS,
+        limit_per_channel: int = 200,
+        near_dup_threshold: float | None = None,
+        raw_format: str = "json",
+        cache_ttl_hours: int = DEFAULT_CACHE_TTL_HOURS,
+    ) -> None:
+        self.client = client
+        self.channels = [_normalize_channel(channel) for channel in channels]
+        self.keywords = keywords
+        self.lookback_hours = lookback_hours
+        self.max_items = max_items
+        self.store = store
+        self.output_dir = output_dir
+        self.debounce_seconds = debounce_seconds
+        self.limit_per_channel = limit_per_channel
+        self.near_dup_threshold = near_dup_threshold
+        self.raw_format = raw_format
+        self.cache_ttl_hours = cache_ttl_hours
+
+        self.snippets: List[Snippet] = []
+        self.stats: Dict[str, int] = {"live_messages": 0, "matched": 0, "snippets": 0, "flushes": 0}
+        self.started_at: str | None = None
+        self._pending: asyncio.TimerHandle | None = None
+        self._chat_channels: Dict[int, str] = {}
+
+    def _result_path(self) -> str:
+        return str(Path(self.output_dir) / "result.md")
+
+    def _since(self) -> datetime:
+        return datetime.now(timezone.utc) - timedelta(hours=self.lookback_hours)
+
+    def _add(self, items: List[Dict]) -> int:
+        matched = list(iter_match(items, self.keywords, with_hits=True))
+        snippets = list(iter_extract(matched, self.keywords))
+        self.stats["matched"] += len(matched)
+        self.snippets.extend(snippets)
+        return len(snippets)
+
+    def seed(self) -> None:
+        since = self._since()
+        items = [
+            _to_item(channel, msg_id, msg_date, text)
+            for channel in self.channels
+            for msg_id, msg_date, text in self.store.messages(
+                channel, since=since, limit=self.limit_per_channel
+            )
+        ]
+        self._add(items)
+
+    async def resolve(self) -> None:
+        for channel in self.channels:
+            self._chat_channels[await self.client.get_peer_id(channel)] = channel
+
+    async def on_message(self, event) -> None:
+        msg = event.message
+        channel = self._chat_channels.get(event.chat_id)
+        if not msg.date or channel is None:
+            return
+
+        msg_date = _as_aware_utc(msg.date)
+        text = msg.message or ""
+
+        self.stats["live_messages"] += 1
+        self.store.add_messages(channel, [(msg.id, msg_date, text)])
+        if self._add([_to_item(channel, msg.id, msg_date, text)]):
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._pending is None:
+            loop = asyncio.get_running_loop()
+            self._pending = loop.call_later(self.debounce_seconds, self._flush_pending)
+
+    def _flush_pending(self) -> None:
+        self._pending = None
+        self.flush()
+
+    def flush(self) -> None:
+        since = self._since()
+        self.snippets = [s for s in self.snippets if s.date is None or s.date >= since]
+        self.store.evict(
+            before=min(since, datetime.now(timezone.utc) - timedelta(hours=self.cache_ttl_hours))
+        )
+
+        save(
+            list(self.snippets),
+            output_dir=self.output_dir,
+            lookback_hours=self.lookback_hours,
+            max_items=self.max_items,
+            include_keywords=self.keywords,
+            raw_format=self.raw_format,
+            near_dup_threshold=self.near_dup_threshold,
+        )
+        self.stats["snippets"] = len(self.snippets)
+        self.stats["flushes"] += 1
+        write_status(
+            state="listening",
+            started_at=self.started_at,
+            finished_at=None,
+            stats=self.stats,
+            result_path=self._result_path(),
+            error=None,
+        )
+
+    async def run(self) -> None:
+        """
+        Resolves chat ids, seeds, writes the initial result, then handles updates until the
+        client disconnects; a pending refresh is written on the way out.
+        """
+        self.started_at = mark_running(result_path=self._result_path())
+        await self.resolve()
+        self.seed()
+        self.flush()
+        self.client.add_event_handler(self.on_message, events.NewMessage(chats=self.channels))
+        try:
+            await self.client.run_until_disconnected()
+        finally:
+            if self._pending is not None:
+                self._pending.cancel()
+                self._pending = None
+                self.flush()
+
+
+# ============================================================
+# Entry point
+# ============================================================
+
+def listen(task_file: str) -> None:
+    """
+    Runs the listener for the telegram sources of a task.yaml (v1).
+    """
+    with Path(task_file).open("r", encoding="utf-8") as f:
+        cfg = validate_task_yaml_v1(yaml.safe_load(f))
+
+    telegram = [src for src in cfg["sources"] if src["type"] == "telegram"]
+    if not telegram:
+        raise RuntimeError("task.yaml has no telegram sources to listen to")
+
+    channels = [channel for src in telegram for channel in src["channels"]]
+    limits = cfg.get("limits", {})
+    store = TelegramStore(TELEGRAM_STATE_PATH)
+    client = _get_client()
+
+    async def run() -> None:
+        async with client:
+            listener = LiveListener(
+                client,
+                channels=channels,
+                keywords=cfg["keywords"],
+                lookback_hours=cfg["lookback_hours"],
+                max_items=limits.get("max_items"),
+                store=store,
+                limit_per_channel=max(src.get("limit_per_channel", 200) for src in telegram),
+                near_dup_threshold=limits.get("near_dup_threshold"),
+                raw_format=cfg.get("output", {}).get("raw_format", "json"),
+                cache_ttl_hours=max(
+                    src.get("cache_ttl_hours", DEFAULT_CACHE_TTL_HOURS) for src in telegram
+                ),
+            )
+            await listener.run()
+
+    try:
+        asyncio.run(run())
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    listen(sys.argv[1] if len(sys.argv) > 1 else "runtime/mapper/task.yaml")
@@ -1,14 +1,28 @@
 from __future__ import annotations
 
-from typing import List, Dict
-from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Iterator, List, Tuple
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import asyncio
 import os
+from contextlib import AsyncExitStack
 
-from telethon.sync import TelegramClient
-from telethon.tl.functions.messages import GetHistoryRequest
-from telethon.errors import RPCError, FloodWaitError
+from telethon import TelegramClient
+from telethon.tl.functions.messages import GetHistoryRequest, SearchRequest
+from telethon.tl.types import InputMessagesFilterEmpty, InputPeerChannel
+from telethon.errors import (
+    ChannelInvalidError,
+    ChannelPrivateError,
+    FloodWaitError,
+    PeerIdInvalidError,
+    RPCError,
+    UsernameInvalidError,
+    UsernameNotOccupiedError,
+)
 from urllib.parse import urlparse
 
+from src.tg_store import ChannelCursor, EntityCache, StoredMessage, TelegramStore
+
 
 # ============================================================
 # Configuration
@@ -19,6 +33,37 @@ SESSION_PATH = os.getenv(
     "/home/micklib/smart-parser/alfred_test"
 )
 
+# Session pool: TG_SESSION_PATHS lists several accounts (os.pathsep-separated).
+SESSION_PATHS = [
+    path for path in os.getenv("TG_SESSION_PATHS", "").split(os.pathsep) if path
+] or [SESSION_PATH]
+
+# Channels fetched at once over each client connection.
+DEFAULT_CONCURRENCY = 8
+
+# Telegram returns at most 100 messages per GetHistoryRequest.
+HISTORY_PAGE_SIZE = 100
+
+# Resolved channel entities are cached next to the session file.
+ENTITY_CACHE_PATH = os.getenv("TG_ENTITY_CACHE_PATH", f"{SESSION_PATH}.entities.sqlite3")
+
+# Server errors that mean a cached entity no longer resolves.
+_INVALID_PEER_ERRORS = (
+    ChannelInvalidError,
+    ChannelPrivateError,
+    PeerIdInvalidError,
+    UsernameInvalidError,
+    UsernameNotOccupiedError,
+)
+
+# FloodWait retries must start within this many seconds of the run start.
+# Sources are read one after another, so this also bounds how long a
+# flood-limited channel can hold up the web / api sources behind it.
+DEFAULT_DEADLINE_SECONDS = 90
+
+# Stored messages are kept this long (or longer, if a lookback needs them).
+DEFAULT_CACHE_TTL_HOURS = 168
+
 
 # ============================================================
 # Helpers
@@ -38,17 +83,480 @@ def _as_aware_utc(dt: datetime) -> datetime:
     return dt.astimezone(timezone.utc)
 
 
-def _get_client() -> TelegramClient:
+def _get_client(session_path: str = SESSION_PATH) -> TelegramClient:
     api_id = int(os.environ["TG_API_ID"])
     api_hash = os.environ["TG_API_HASH"]
 
+    # FloodWaits are scheduled by the reader, never slept on inside a request.
     return TelegramClient(
-        SESSION_PATH,
+        session_path,
         api_id,
         api_hash,
+        flood_sleep_threshold=0,
     )
 
 
+# ============================================================
+# Channel fetching
+# ============================================================
+
+def _to_item(channel: str, msg_id: int, msg_date: datetime, text: str) -> Dict:
+    return {
+        "source": "telegram",
+        "channel": channel,
+        "date": msg_date,
+        "text": text,
+        "url": f"https://t.me/{channel}/{msg_id}",
+    }
+
+
+async def _iter_history_pages(
+    client: TelegramClient,
+    peer,
+    *,
+    since_dt: datetime,
+    until_dt: datetime | None,
+    limit: int,
+    min_id: int = 0,
+) -> AsyncIterator[list]:
+    """
+    Pages of raw history (newest first) walked backwards with offset_id,
+    restricted to ids above min_id when given.
+
+    Stops once `limit` messages were fetched, history is exhausted, or a
+    page reaches past since_dt (everything older is outside the window).
+    With min_id the walk continues down to min_id regardless of since_dt,
+    so the range above a stored watermark is read without holes.
+    """
+    offset_id = 0
+    fetched = 0
+
+    while fetched < limit:
+        page_size = min(HISTORY_PAGE_SIZE, limit - fetched)
+        history = await client(
+            GetHistoryRequest(
+                peer=peer,
+                offset_id=offset_id,
+                offset_date=until_dt if offset_id == 0 else None,
+                add_offset=0,
+                limit=page_size,
+                max_id=0,
+                min_id=min_id,
+                hash=0,
+            )
+        )
+        page = list(history.messages)
+        if not page:
+            return
+
+        fetched += len(page)
+        yield page
+
+        oldest = page[-1]
+        if len(page) < page_size:
+            return
+        if not min_id and oldest.date and _as_aware_utc(oldest.date) < since_dt:
+            return
+        offset_id = oldest.id
+
+
+async def _fetch_range(
+    client: TelegramClient,
+    peer,
+    *,
+    since_dt: datetime,
+    until_dt: datetime | None,
+    limit: int,
+    min_id: int = 0,
+) -> Tuple[List[StoredMessage], bool]:
+    """
+    (id, date, text) of one history range dated since_dt or later, plus
+    whether the range was read completely (not cut off by `limit`).
+
+    With min_id everything above min_id is kept, older than since_dt or
+    not: the caller stores it as one contiguous range up to its cursor.
+    """
+    fetched: List[StoredMessage] = []
+    raw_count = 0
+    reached_since = False
+    pages = _iter_history_pages(
+        client,
+        peer,
+        since_dt=since_dt,
+        until_dt=until_dt,
+        limit=limit,
+        min_id=min_id,
+    )
+    async for page in pages:
+        raw_count += len(page)
+        for msg in page:
+            if not msg.date:
+                continue
+
+            msg_date = _as_aware_utc(msg.date)
+            if msg_date < since_dt and not min_id:
+                reached_since = True
+                continue
+
+            fetched.append((msg.id, msg_date, msg.message or ""))
+    return fetched, reached_since or raw_count < limit
+
+
+def _oldest_date(messages: List[StoredMessage], default: datetime) -> datetime:
+    return min((msg_date for _, msg_date, _ in messages), default=default)
+
+
+async def _resolve_peer(client: TelegramClient, channel: str, entities: EntityCache):
+    """
+    Resolves a channel username through the client (ResolveUsername) and
+    caches the resulting input peer.
+    """
+    peer = await client.get_input_entity(channel)
+    if isinstance(peer, InputPeerChannel):
+        entities.put(channel, peer.channel_id, peer.access_hash)
+    return peer
+
+
+async def _fetch_channel(
+    client: TelegramClient,
+    channel: str,
+    *,
+    entities: EntityCache | None = None,
+    **kwargs,
+) -> List[Dict]:
+    if entities is None:
+        return await _fetch_channel_history(client, channel, channel, **kwargs)
+
+    cached = entities.get(channel)
+    if cached is None:
+        peer = await _resolve_peer(client, channel, entities)
+        return await _fetch_channel_history(client, channel, peer, **kwargs)
+
+    peer = InputPeerChannel(channel_id=cached[0], access_hash=cached[1])
+    try:
+        return await _fetch_channel_history(client, channel, peer, **kwargs)
+    except _INVALID_PEER_ERRORS:
+        # Only the server decides a cached entity is stale: drop it and
+        # retry once with a fresh resolution.
+        entities.invalidate(channel)
+        peer = await _resolve_peer(client, channel, entities)
+        return await _fetch_channel_history(client, channel, peer, **kwargs)
+
+
+async def _fetch_channel_history(
+    client: TelegramClient,
+    channel: str,
+    peer,
+    *,
+    since_dt: datetime,
+    until_dt: datetime | None,
+    limit_per_channel: int,
+    store: TelegramStore | None = None,
+    now: datetime | None = None,
+    cache_max_age: timedelta = timedelta(0),
+    mode: str = "history",
+    keywords: List[str] | None = None,
+) -> List[Dict]:
+    if mode == "search":
+        return await _search_channel(
+            client,
+            channel,
+            peer,
+            keywords=keywords or [],
+            since_dt=since_dt,
+            until_dt=until_dt,
+            limit_per_channel=limit_per_channel,
+        )
+
+    if store is not None and until_dt is None:
+        return await _fetch_channel_cached(
+            client,
+            channel,
+            peer,
+            since_dt=since_dt,
+            limit_per_channel=limit_per_channel,
+            store=store,
+            now=now or datetime.now(timezone.utc),
+            cache_max_age=cache_max_age,
+        )
+
+    fetched, _ = await _fetch_range(
+        client,
+        peer,
+        since_dt=since_dt,
+        until_dt=until_dt,
+        limit=limit_per_channel,
+    )
+    return [_to_item(channel, msg_id, msg_date, text) for msg_id, msg_date, text in fetched]
+
+
+async def _iter_search_pages(
+    client: TelegramClient,
+    peer,
+    query: str,
+    *,
+    since_dt: datetime,
+    until_dt: datetime | None,
+    limit: int,
+) -> AsyncIterator[list]:
+    """
+    Pages of server-side search results for one query (newest first),
+    bounded to since_dt..until_dt by the server, walked with offset_id.
+    """
+    offset_id = 0
+    fetched = 0
+
+    while fetched < limit:
+        page_size = min(HISTORY_PAGE_SIZE, limit - fetched)
+        found = await client(
+            SearchRequest(
+                peer=peer,
+                q=query,
+                filter=InputMessagesFilterEmpty(),
+                min_date=since_dt,
+                max_date=until_dt,
+                offset_id=offset_id,
+                add_offset=0,
+                limit=page_size,
+                max_id=0,
+                min_id=0,
+                hash=0,
+            )
+        )
+        page = list(found.messages)
+        if not page:
+            return
+
+        fetched += len(page)
+        yield page
+
+        if len(page) < page_size:
+            return
+        offset_id = page[-1].id
+
+
+async def _search_channel(
+    client: TelegramClient,
+    channel: str,
+    peer,
+    *,
+    keywords: List[str],
+    since_dt: datetime,
+    until_dt: datetime | None,
+    limit_per_channel: int,
+) -> List[Dict]:
+    """
+    Search mode: one server-side search per keyword instead of downloading
+    the whole window. Results are unioned by message id and returned newest
+    first (at most limit_per_channel); match() still has the final say.
+    """
+    found: Dict[int, StoredMessage] = {}
+    for keyword in dict.fromkeys(keywords):
+        pages = _iter_search_pages(
+            client,
+            peer,
+            keyword,
+            since_dt=since_dt,
+            until_dt=until_dt,
+            limit=limit_per_channel,
+        )
+        async for page in pages:
+            for msg in page:
+                if not msg.date or msg.id in found:
+                    continue
+
+                msg_date = _as_aware_utc(msg.date)
+                if msg_date < since_dt:
+                    continue
+
+                found[msg.id] = (msg.id, msg_date, msg.message or "")
+
+    newest = sorted(found.values(), key=lambda m: m[0], reverse=True)[:limit_per_channel]
+    return [_to_item(channel, msg_id, msg_date, text) for msg_id, msg_date, text in newest]
+
+
+async def _fetch_channel_cached(
+    client: TelegramClient,
+    channel: str,
+    peer,
+    *,
+    since_dt: datetime,
+    limit_per_channel: int,
+    store: TelegramStore,
+    now: datetime,
+    cache_max_age: timedelta,
+) -> List[Dict]:
+    """
+    Serves the window from the local store, fetching only what it lacks:
+    messages newer than the cursor (min_id; skipped while the cursor is
+    younger than cache_max_age) and history older than the stored coverage.
+    """
+    cursor = store.cursor(channel)
+    fetched: List[StoredMessage] = []
+
+    if cursor is None:
+        fetched, complete = await _fetch_range(
+            client,
+            peer,
+            since_dt=since_dt,
+            until_dt=None,
+            limit=limit_per_channel,
+        )
+        last_id = max((msg_id for msg_id, _, _ in fetched), default=0)
+        covered_since = since_dt if complete else _oldest_date(fetched, since_dt)
+        fetched_at = now
+    else:
+        last_id = cursor.last_id
+        covered_since = cursor.covered_since
+        fetched_at = cursor.fetched_at
+        complete = True
+
+        if now - cursor.fetched_at >= cache_max_age:
+            fetched, complete = await _fetch_range(
+                client,
+                peer,
+                since_dt=since_dt,
+                until_dt=None,
+                limit=limit_per_channel,
+                min_id=cursor.last_id,
+            )
+            last_id = max([msg_id for msg_id, _, _ in fetched] + [last_id])
+            fetched_at = now
+            if not complete:
+                # Gap between the newest page(s) and the stored copy.
+                covered_since = _oldest_date(fetched, since_dt)
+
+        if complete and since_dt < covered_since:
+            older, complete = await _fetch_range(
+                client,
+                peer,
+                since_dt=since_dt,
+                until_dt=covered_since,
+                limit=limit_per_channel,
+            )
+            fetched.extend(older)
+            covered_since = since_dt if complete else _oldest_date(older, covered_since)
+
+    store.add_messages(channel, fetched)
+    store.set_cursor(
+        channel,
+        ChannelCursor(last_id=last_id, covered_since=covered_since, fetched_at=fetched_at),
+    )
+
+    return [
+        _to_item(channel, msg_id, msg_date, text)
+        for msg_id, msg_date, text in store.messages(
+            channel, since=since_dt, limit=limit_per_channel
+        )
+    ]
+
+
+async def _fetch_channel_safe(client: TelegramClient, channel: str, **kwargs) -> List[Dict]:
+    try:
+        return await _fetch_channel(client, channel, **kwargs)
+
+    except FloodWaitError:
+        # Telegram rate limit — the scheduler decides whether to retry
+        raise
+
+    except RPCError:
+        # Private / banned / inaccessible channel
+        return []
+
+    except Exception:
+        # Absolute safety net — never crash pipeline
+        return []
+
+
+class _Session:
+    """
+    One pooled Telegram account: its client, concurrency slots, the loop
+    time its FloodWait expires and the number of requests sent through it.
+    Callable like the client, so the fetch helpers take it as `client`.
+
+    `key` identifies the account (resolved session path): two session
+    files with the same basename in different directories are different
+    accounts.
+    """
+
+    __slots__ = ("key", "client", "semaphore", "entities", "flood_until", "requests")
+
+    def __init__(
+        self,
+        key: str,
+        client: TelegramClient,
+        *,
+        concurrency: int,
+        entities: EntityCache | None,
+    ) -> None:
+        self.key = key
+        self.client = client
+        self.semaphore = asyncio.Semaphore(max(concurrency, 1))
+        self.entities = entities
+        self.flood_until = 0.0
+        self.requests = 0
+
+    async def __call__(self, request):
+        self.requests += 1
+        return await self.client(request)
+
+    async def get_input_entity(self, peer):
+        self.requests += 1
+        return await self.client.get_input_entity(peer)
+
+
+def _pick_session(sessions: List[_Session], preferred: _Session, now: float) -> _Session | None:
+    """
+    The channel's own shard if it is not flood-limited, else the least
+    used session that is not; None while every session has to wait.
+    """
+    if preferred.flood_until <= now:
+        return preferred
+    ready = [session for session in sessions if session.flood_until <= now]
+    if not ready:
+        return None
+    return min(ready, key=lambda session: session.requests)
+
+
+async def _fetch_channel_scheduled(
+    sessions: List[_Session],
+    preferred: _Session,
+    channel: str,
+    *,
+    deadline: float,
+    report: Dict,
+    **kwargs,
+) -> List[Dict]:
+    """
+    FloodWait-aware fetch over the session pool. A FloodWait marks the
+    session limited for the demanded wait and the channel moves to another
+    session right away. When every session is limited, the channel gives
+    its slot back and sleeps until the first one frees up, provided that
+    retry starts before the run deadline (loop time). Otherwise it is
+    dropped. Waiting and dropped channels are recorded in `report`.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        session = _pick_session(sessions, preferred, loop.time())
+        if session is None:
+            resume_at = min(s.flood_until for s in sessions)
+            if resume_at > deadline:
+                report["dropped"].append(channel)
+                return []
+            if channel not in report["deferred"]:
+                report["deferred"].append(channel)
+            await asyncio.sleep(resume_at - loop.time())
+            continue
+
+        async with session.semaphore:
+            try:
+                return await _fetch_channel_safe(
+                    session, channel, entities=session.entities, **kwargs
+                )
+            except FloodWaitError as e:
+                session.flood_until = max(session.flood_until, loop.time() + e.seconds)
+
+
 # ============================================================
 # Public API (task.yaml v1)
 # ============================================================
@@ -59,71 +567,210 @@ def read_messages(
     since: datetime,
     until: datetime | None = None,
     limit_per_channel: int = 200,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    state_path: str | Path | None = None,
+    cache_ttl_hours: int = DEFAULT_CACHE_TTL_HOURS,
+    cache_max_age_minutes: int = 0,
+    entity_cache_path: str | Path | None = None,
+    deadline_seconds: float = DEFAULT_DEADLINE_SECONDS,
+    report: Dict[str, List[str]] | None = None,
+    mode: str = "history",
+    keywords: List[str] | None = None,
+    sessions: List[str] | None = None,
 ) -> List[Dict]:
     """
     tg_reader v1
 
-    - Stateless
+    - Stateless unless `state_path` is given: then messages are cached
+      there per (channel, id) for `cache_ttl_hours`, repeat lookbacks are
+      served from the cache and only missing ranges are fetched (newer than
+      the per-channel watermark via min_id, older than the stored coverage).
+      Within `cache_max_age_minutes` of the last check the network is not
+      touched at all. Bounded (`until`) reads stay stateless.
+    - With `entity_cache_path`, channel usernames are resolved once and
+      the input peer (id + access hash) is reused until Telegram reports it
+      invalid
     - No keyword filtering
     - Graceful degradation per channel
+    - Channels fetched concurrently (up to `concurrency` at once per session)
+    - `sessions` (default SESSION_PATHS) is a pool of accounts: channels are
+      sharded round-robin across them and a channel whose session hits
+      FloodWait moves to a session that is not limited
+    - When every session is limited a channel waits for the first to free
+      up while the others continue; channels whose retry would start after
+      `deadline_seconds` are dropped. `report` (if given) collects
+      report["deferred"] / report["dropped"] and per-session request
+      counts in report["sessions"] (keyed by resolved session path)
+    - mode="search" asks Telegram to search each channel for `keywords`
+      within the window instead of downloading its history (no message
+      cache); results are unioned and deduped by message id
     """
 
-    results: List[Dict] = []
+    return list(
+        iter_messages(
+            channels=channels,
+            since=since,
+            until=until,
+            limit_per_channel=limit_per_channel,
+            concurrency=concurrency,
+            state_path=state_path,
+            cache_ttl_hours=cache_ttl_hours,
+            cache_max_age_minutes=cache_max_age_minutes,
+            entity_cache_path=entity_cache_path,
+            deadline_seconds=deadline_seconds,
+            report=report,
+            mode=mode,
+            keywords=keywords,
+            sessions=sessions,
+        )
+    )
+
+
+async def iter_messages_async(
+    *,
+    channels: List[str],
+    since: datetime,
+    until: datetime | None = None,
+    limit_per_channel: int = 200,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    state_path: str | Path | None = None,
+    cache_ttl_hours: int = DEFAULT_CACHE_TTL_HOURS,
+    cache_max_age_minutes: int = 0,
+    entity_cache_path: str | Path | None = None,
+    deadline_seconds: float = DEFAULT_DEADLINE_SECONDS,
+    report: Dict[str, List[str]] | None = None,
+    mode: str = "history",
+    keywords: List[str] | None = None,
+    sessions: List[str] | None = None,
+) -> AsyncIterator[Dict]:
+    """
+    asyncio-native reader: all channels are requested concurrently over one
+    client connection (bounded by `concurrency`); messages are yielded in
+    channel order as soon as that channel's fetch is done.
+    """
 
     if limit_per_channel <= 0:
-        return results
+        return
 
     since_dt = _as_aware_utc(since)
     until_dt = _as_aware_utc(until) if until else None
 
-    client = _get_client()
+    session_paths = list(sessions or SESSION_PATHS)
+    clients = [_get_client(path) for path in session_paths]
+    now = datetime.now(timezone.utc)
+    store = None
+    if state_path:
+        store = TelegramStore(Path(state_path))
+        store.evict(before=min(since_dt, now - timedelta(hours=cache_ttl_hours)))
 
-    with client:
-        for raw_channel in channels:
-            channel = _normalize_channel(raw_channel)
+    # Access hashes are per account, so each session resolves into its own scope.
+    session_keys = [str(Path(path).resolve()) for path in session_paths]
+    pool = [
+        _Session(
+            key,
+            client,
+            concurrency=concurrency,
+            entities=EntityCache(Path(entity_cache_path), scope=key) if entity_cache_path else None,
+        )
+        for key, client in zip(session_keys, clients)
+    ]
 
-            try:
-                history = client(
-                    GetHistoryRequest(
-                        peer=channel,
-                        offset_id=0,
-                        offset_date=until_dt,
-                        add_offset=0,
-                        limit=limit_per_channel,
-                        max_id=0,
-                        min_id=0,
-                        hash=0,
-                    )
-                )
+    if report is None:
+        report = {}
+    report.setdefault("deferred", [])
+    report.setdefault("dropped", [])
+    report.setdefault("sessions", {})
 
-                for msg in history.messages:
-                    if not msg.date:
-                        continue
-
-                    msg_date = _as_aware_utc(msg.date)
-                    if msg_date < since_dt:
-                        continue
-
-                    results.append(
-                        {
-                            "source": "telegram",
-                            "channel": channel,
-                            "date": msg_date,
-                            "text": msg.message or "",
-                            "url": f"https://t.me/{channel}/{msg.id}",
-                        }
-                    )
-
-            except FloodWaitError:
-                # Telegram rate limit — skip channel, continue
-                continue
+    async with AsyncExitStack() as stack:
+        for client in clients:
+            await stack.enter_async_context(client)
+        deadline = asyncio.get_running_loop().time() + deadline_seconds
 
-            except RPCError:
-                # Private / banned / inaccessible channel
-                continue
+        async def fetch(index: int, channel: str) -> List[Dict]:
+            return await _fetch_channel_scheduled(
+                pool,
+                pool[index % len(pool)],
+                channel,
+                deadline=deadline,
+                report=report,
+                since_dt=since_dt,
+                until_dt=until_dt,
+                limit_per_channel=limit_per_channel,
+                store=store,
+                now=now,
+                cache_max_age=timedelta(minutes=cache_max_age_minutes),
+                mode=mode,
+                keywords=keywords,
+            )
+
+        tasks = [
+            asyncio.ensure_future(fetch(index, _normalize_channel(raw_channel)))
+            for index, raw_channel in enumerate(channels)
+        ]
+        try:
+            for task in tasks:
+                for message in await task:
+                    yield message
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if store is not None:
+                store.close()
+            for session in pool:
+                report["sessions"][session.key] = (
+                    report["sessions"].get(session.key, 0) + session.requests
+                )
+                if session.entities is not None:
+                    session.entities.close()
 
-            except Exception:
-                # Absolute safety net — never crash pipeline
-                continue
 
-    return results
+def iter_messages(
+    *,
+    channels: List[str],
+    since: datetime,
+    until: datetime | None = None,
+    limit_per_channel: int = 200,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    state_path: str | Path | None = None,
+    cache_ttl_hours: int = DEFAULT_CACHE_TTL_HOURS,
+    cache_max_age_minutes: int = 0,
+    entity_cache_path: str | Path | None = None,
+    deadline_seconds: float = DEFAULT_DEADLINE_SECONDS,
+    report: Dict[str, List[str]] | None = None,
+    mode: str = "history",
+    keywords: List[str] | None = None,
+    sessions: List[str] | None = None,
+) -> Iterator[Dict]:
+    """
+    Streaming form of read_messages(): drives iter_messages_async() on a
+    private event loop and yields messages to synchronous callers.
+    """
+
+    loop = asyncio.new_event_loop()
+    messages = iter_messages_async(
+        channels=channels,
+        since=since,
+        until=until,
+        limit_per_channel=limit_per_channel,
+        concurrency=concurrency,
+        state_path=state_path,
+        cache_ttl_hours=cache_ttl_hours,
+        cache_max_age_minutes=cache_max_age_minutes,
+        entity_cache_path=entity_cache_path,
+        deadline_seconds=deadline_seconds,
+        report=report,
+        mode=mode,
+        keywords=keywords,
+        sessions=sessions,
+    )
+    try:
+        while True:
+            try:
+                message = loop.run_until_complete(messages.__anext__())
+            except StopAsyncIteration:
+                break
+            yield message
+    finally:
+        loop.run_until_complete(messages.aclose())
+        loop.close()
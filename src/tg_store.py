@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+# ============================================================
+# Models
+# ============================================================
+
+@dataclass(frozen=True)
+class ChannelCursor:
+    last_id: int                # newest message id stored for the channel
+    covered_since: datetime     # stored history is complete from here to last_id
+    fetched_at: datetime        # when last_id was last checked against the server
+
+
+# (id, date, text)
+StoredMessage = Tuple[int, datetime, str]
+
+
+def _ts(dt: datetime) -> float:
+    return dt.timestamp()
+
+
+def _dt(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+
+# ============================================================
+# Store
+# ============================================================
+
+class TelegramStore:
+    """
+    Local Telegram state for tg_reader (SQLite).
+
+    - cursors: channel -> newest stored message id + start of the window
+      the stored copy is complete for
+    - messages: retained channel messages keyed by (channel, id), so repeat
+      lookbacks are answered locally and only missing ranges are fetched
+    - evict(): TTL-based removal of old messages across all channels
+    """
+
+    def __init__(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS cursors (
+                channel TEXT PRIMARY KEY,
+                last_id INTEGER NOT NULL,
+                covered_since REAL NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS messages (
+                channel TEXT NOT NULL,
+                id INTEGER NOT NULL,
+                date REAL NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (channel, id)
+            );
+            CREATE INDEX IF NOT EXISTS messages_by_date ON messages (channel, date);
+            """
+        )
+        self._conn.commit()
+
+    # --- cursors ---
+
+    def cursor(self, channel: str) -> Optional[ChannelCursor]:
+        row = self._conn.execute(
+            "SELECT last_id, covered_since, fetched_at FROM cursors WHERE channel = ?",
+            (channel,),
+        ).fetchone()
+        if row is None:
+            return None
+        return ChannelCursor(last_id=row[0], covered_since=_dt(row[1]), fetched_at=_dt(row[2]))
+
+    def set_cursor(self, channel: str, cursor: ChannelCursor) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO cursors (channel, last_id, covered_since, fetched_at) "
+            "VALUES (?, ?, ?, ?)",
+            (channel, cursor.last_id, _ts(cursor.covered_since), _ts(cursor.fetched_at)),
+        )
+        self._conn.commit()
+
+    # --- messages ---
+
+    def add_messages(self, channel: str, messages: List[StoredMessage]) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO messages (channel, id, date, text) VALUES (?, ?, ?, ?)",
+            [(channel, msg_id, _ts(date), text) for msg_id, date, text in messages],
+        )
+        self._conn.commit()
+
+    def messages(self, channel: str, *, since: datetime, limit: int) -> List[StoredMessage]:
+        """
+        Newest-first messages of a channel dated since..now, at most `limit`.
+        """
+        rows = self._conn.execute(
+            "SELECT id, date, text FROM messages WHERE channel = ? AND date >= ? "
+            "ORDER BY id DESC LIMIT ?",
+            (channel, _ts(since), limit),
+        ).fetchall()
+        return [(row[0], _dt(row[1]), row[2]) for row in rows]
+
+    def evict(self, *, before: datetime) -> None:
+        """
+        TTL eviction: drops retained messages older than `before` in every
+        channel and narrows the cursors' coverage accordingly.
+        """
+        self._conn.execute("DELETE FROM messages WHERE date < ?", (_ts(before),))
+        self._conn.execute(
+            "UPDATE cursors SET covered_since = MAX(covered_since, ?)",
+            (_ts(before),),
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+# ============================================================
+# Entity resolution cache
+# ============================================================
+
+class EntityCache:
+    """
+    Persistent username -> (channel id, access hash) map (SQLite), kept
+    next to the Telethon session so channels are not re-resolved
+    (ResolveUsername) on every run. Entries are dropped only when the
+    server reports the peer invalid. Access hashes are only valid for the
+    account that obtained them, so entries are kept per `scope` (session).
+    """
+
+    def __init__(self, path: Path, *, scope: str = "") -> None:
+        self._scope = scope
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entities (
+                scope TEXT NOT NULL,
+                username TEXT NOT NULL,
+                channel_id INTEGER NOT NULL,
+                access_hash INTEGER NOT NULL,
+                PRIMARY KEY (scope, username)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, username: str) -> Optional[Tuple[int, int]]:
+        row = self._conn.execute(
+            "SELECT channel_id, access_hash FROM entities WHERE scope = ? AND username = ?",
+            (self._scope, username.lower()),
+        ).fetchone()
+        return (row[0], row[1]) if row is not None else None
+
+    def put(self, username: str, channel_id: int, access_hash: int) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO entities (scope, username, channel_id, access_hash) "
+            "VALUES (?, ?, ?, ?)",
+            (self._scope, username.lower(), channel_id, access_hash),
+        )
+        self._conn.commit()
+
+    def invalidate(self, username: str) -> None:
+        self._conn.execute(
+            "DELETE FROM entities WHERE scope = ? AND username = ?",
+            (self._scope, username.lower()),
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
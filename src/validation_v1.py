@@ -8,6 +8,9 @@ Contract summary (task.yaml v1):
   sources: [source_block]            (required, >=1)
   limits:
     max_items: int                   (optional, 1..10000)
+    near_dup_threshold: number       (optional, (0, 1])
+  output:
+    raw_format: json|ndjson          (optional)
 
 Sources are a list of dicts; each source must include "type".
 Supported source types in v1: telegram, web, api.
@@ -75,6 +78,14 @@ def _require_int_range(path: str, v: Any, lo: int, hi: int) -> int:
     return v
 
 
+def _require_fraction(path: str, v: Any) -> float:
+    if isinstance(v, bool) or not isinstance(v, (int, float)):
+        _err(path, "type", "number", _type_name(v))
+    if not (0 < v <= 1):
+        _err(path, "range", "(0, 1]", v)
+    return float(v)
+
+
 def _require_unique_list_of_str(path: str, v: Any, *, min_len: int = 1) -> List[str]:
     arr = _require_list(path, v)
     if len(arr) < min_len:
@@ -101,7 +112,16 @@ def _reject_unknown_fields(obj_path: str, obj: Dict[str, Any], allowed: set[str]
 
 def _validate_source_telegram(src: Dict[str, Any], idx: int) -> Dict[str, Any]:
     base = f"sources[{idx}]"
-    allowed = {"type", "channels", "limit_per_channel"}
+    allowed = {
+        "type",
+        "channels",
+        "limit_per_channel",
+        "concurrency",
+        "cache_ttl_hours",
+        "cache_max_age_minutes",
+        "deadline_seconds",
+        "mode",
+    }
     _reject_unknown_fields(base, src, allowed)
 
     channels = _require_unique_list_of_str(f"{base}.channels", src.get("channels"), min_len=1)
@@ -119,6 +139,44 @@ def _validate_source_telegram(src: Dict[str, Any], idx: int) -> Dict[str, Any]:
             1000,
         )
 
+    if "concurrency" in src:
+        norm["concurrency"] = _require_int_range(
+            f"{base}.concurrency",
+            src.get("concurrency"),
+            1,
+            32,
+        )
+
+    if "cache_ttl_hours" in src:
+        norm["cache_ttl_hours"] = _require_int_range(
+            f"{base}.cache_ttl_hours",
+            src.get("cache_ttl_hours"),
+            1,
+            8760,
+        )
+
+    if "cache_max_age_minutes" in src:
+        norm["cache_max_age_minutes"] = _require_int_range(
+            f"{base}.cache_max_age_minutes",
+            src.get("cache_max_age_minutes"),
+            0,
+            1440,
+        )
+
+    if "deadline_seconds" in src:
+        norm["deadline_seconds"] = _require_int_range(
+            f"{base}.deadline_seconds",
+            src.get("deadline_seconds"),
+            1,
+            3600,
+        )
+
+    if "mode" in src:
+        mode = _require_nonempty_str(f"{base}.mode", src.get("mode"))
+        if mode not in ("history", "search"):
+            _err(f"{base}.mode", "enum", "history|search", src.get("mode"))
+        norm["mode"] = mode
+
     return norm
 
 
@@ -211,7 +269,7 @@ def validate_task_yaml_v1(cfg: Any) -> Dict[str, Any]:
         _err("$", "type", "dict", _type_name(cfg))
 
     # Phase 1: root strict fields
-    allowed_root = {"version", "lookback_hours", "keywords", "sources", "limits"}
+    allowed_root = {"version", "lookback_hours", "keywords", "sources", "limits", "output"}
     _reject_unknown_fields("", cfg, allowed_root)
 
     # required
@@ -260,7 +318,7 @@ def validate_task_yaml_v1(cfg: Any) -> Dict[str, Any]:
     if "limits" in cfg:
         limits_any = cfg.get("limits")
         limits = _require_dict("limits", limits_any)
-        allowed_limits = {"max_items"}
+        allowed_limits = {"max_items", "near_dup_threshold"}
         _reject_unknown_fields("limits", limits, allowed_limits)
 
         if "max_items" not in limits:
@@ -268,6 +326,25 @@ def validate_task_yaml_v1(cfg: Any) -> Dict[str, Any]:
         max_items = _require_int_range("limits.max_items", limits.get("max_items"), 1, 10_000)
         normalized_limits = {"max_items": max_items}
 
+        if "near_dup_threshold" in limits:
+            normalized_limits["near_dup_threshold"] = _require_fraction(
+                "limits.near_dup_threshold",
+                limits.get("near_dup_threshold"),
+            )
+
+    # output (optional)
+    normalized_output: Optional[Dict[str, Any]] = None
+    if "output" in cfg:
+        output = _require_dict("output", cfg.get("output"))
+        _reject_unknown_fields("output", output, {"raw_format"})
+
+        normalized_output = {}
+        if "raw_format" in output:
+            raw_format = _require_nonempty_str("output.raw_format", output.get("raw_format"))
+            if raw_format not in ("json", "ndjson"):
+                _err("output.raw_format", "enum", "json|ndjson", output.get("raw_format"))
+            normalized_output["raw_format"] = raw_format
+
     out: Dict[str, Any] = {
         "version": "v1",
         "lookback_hours": lookback_hours,
@@ -276,5 +353,7 @@ def validate_task_yaml_v1(cfg: Any) -> Dict[str, Any]:
     }
     if normalized_limits is not None:
         out["limits"] = normalized_limits
+    if normalized_output is not None:
+        out["output"] = normalized_output
 
     return out
@@ -1,13 +1,34 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta, timezone
 from email.utils import parsedate_to_datetime
 from html.parser import HTMLParser
-from typing import Any
+from pathlib import Path
+from typing import Any, Iterator
+import threading
+import time
 from urllib.parse import urlparse
-from urllib.request import Request, urlopen
 import xml.etree.ElementTree as ET
 
+from src.http_transport import HttpResponse, HttpStatusError, get_transport
+from src.web_store import ArticleCache, CachedFeed, FeedCache
+
+
+# ============================================================
+# Configuration
+# ============================================================
+
+# Article pages fetched at once per site, and at once per host.
+DEFAULT_ARTICLE_WORKERS = 8
+DEFAULT_PER_HOST_LIMIT = 4
+
+# A site's article fetches must finish within this many seconds; articles
+# still missing then fall back to their RSS summary.
+DEFAULT_SITE_DEADLINE_SECONDS = 60.0
+
+ARTICLE_TIMEOUT_SECONDS = 20
+
 
 # ============================================================
 # Helpers
@@ -53,16 +74,39 @@ def _parse_rfc822_date(value: str) -> datetime | None:
 
 
 def fetch_url(url: str, timeout_seconds: int = 20) -> str:
-    req = Request(
+    resp = get_transport().get(
         url,
         headers={
             "User-Agent": "alfred-datahub/1.0",
             "Accept": "text/html,application/xml;q=0.9,*/*;q=0.8",
         },
-        method="GET",
+        timeout=timeout_seconds,
     )
-    with urlopen(req, timeout=timeout_seconds) as resp:
-        raw = resp.read()
+    if resp.status >= 400:
+        raise HttpStatusError(resp)
+    return _decode(resp.body)
+
+
+def _fetch_feed(url: str, cached: CachedFeed | None, timeout_seconds: int = 20) -> HttpResponse:
+    """
+    GET for an RSS feed, conditional on the cached validators if any.
+    """
+    headers = {
+        "User-Agent": "alfred-datahub/1.0",
+        "Accept": "application/rss+xml,application/xml;q=0.9,*/*;q=0.8",
+    }
+    if cached is not None and cached.etag:
+        headers["If-None-Match"] = cached.etag
+    if cached is not None and cached.last_modified:
+        headers["If-Modified-Since"] = cached.last_modified
+
+    resp = get_transport().get(url, headers=headers, timeout=timeout_seconds)
+    if resp.status >= 400:
+        raise HttpStatusError(resp)
+    return resp
+
+
+def _decode(raw: bytes) -> str:
     try:
         return raw.decode("utf-8")
     except UnicodeDecodeError:
@@ -89,35 +133,89 @@ def _first_text(elem: ET.Element, paths: list[str]) -> str:
     return ""
 
 
-def parse_rss(xml_text: str, site: str) -> list[dict[str, Any]]:
-    root = ET.fromstring(xml_text)
-    items: list[dict[str, Any]] = []
+_CONTENT_ENCODED = "{http://purl.org/rss/1.0/modules/content/}encoded"
 
-    for it in root.findall("./channel/item"):
-        title = _first_text(it, ["title"])
-        link = _first_text(it, ["link"])
-        pub_date_raw = _first_text(it, ["pubDate"])
-        dt = _parse_rfc822_date(pub_date_raw)
+# Characters of feed text handed to the incremental parser at a time.
+_RSS_CHUNK_SIZE = 64 * 1024
 
-        desc = _first_text(it, ["description"])
-        content = _first_text(it, ["{http://purl.org/rss/1.0/modules/content/}encoded"])
-        summary = _strip_html(content or desc)
+# iter_rss(since=...) stops only after this many consecutive items older
+# than the cutoff, so one out-of-order (updated / pinned) item can't cut
+# the fresh items behind it.
+_RSS_STOP_AFTER_OLDER = 5
 
-        if not link:
-            continue
 
-        items.append(
-            {
-                "source": "web",
-                "site": site,
-                "title": title or "",
-                "date": dt,
-                "text": summary or "",
-                "url": link,
-            }
-        )
+def _rss_item(it: ET.Element, site: str) -> dict[str, Any] | None:
+    title = _first_text(it, ["title"])
+    link = _first_text(it, ["link"])
+    pub_date_raw = _first_text(it, ["pubDate"])
+    dt = _parse_rfc822_date(pub_date_raw)
+
+    desc = _first_text(it, ["description"])
+    content = _first_text(it, [_CONTENT_ENCODED])
+    summary = _strip_html(content or desc)
 
-    return items
+    if not link:
+        return None
+
+    return {
+        "source": "web",
+        "site": site,
+        "title": title or "",
+        "date": dt,
+        "text": summary or "",
+        "url": link,
+    }
+
+
+def iter_rss(xml_text: str, site: str, *, since: datetime | None = None) -> Iterator[dict[str, Any]]:
+    """
+    Incremental parse_rss(): the document is fed to an XMLPullParser in
+    chunks and each <channel><item> is yielded and discarded as soon as it
+    is complete, so memory stays bounded by one item.
+
+    With `since`, parsing stops after _RSS_STOP_AFTER_OLDER consecutive
+    items older than the cutoff, as long as the feed has been newest-first
+    throughout (every dated item no newer than the one before). Other
+    feeds are read to the end; older items are left to the caller's filter.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    path: list[ET.Element] = []
+    newest_first = True
+    previous: datetime | None = None
+    older = 0
+
+    for offset in range(0, max(len(xml_text), 1), _RSS_CHUNK_SIZE):
+        parser.feed(xml_text[offset:offset + _RSS_CHUNK_SIZE])
+        for event, elem in parser.read_events():
+            if event == "start":
+                path.append(elem)
+                continue
+
+            path.pop()
+            if elem.tag != "item" or len(path) != 2 or path[1].tag != "channel":
+                continue
+
+            item = _rss_item(elem, site)
+            path[1].remove(elem)
+            if item is None:
+                continue
+
+            dt = item["date"]
+            if since is not None and dt is not None:
+                if previous is not None:
+                    newest_first = newest_first and dt <= previous
+                previous = dt
+                older = older + 1 if dt < since else 0
+                if newest_first and older >= _RSS_STOP_AFTER_OLDER:
+                    return
+
+            yield item
+
+    parser.close()
+
+
+def parse_rss(xml_text: str, site: str) -> list[dict[str, Any]]:
+    return list(iter_rss(xml_text, site))
 
 
 # ============================================================
@@ -136,6 +234,50 @@ def _get_feed_url(site: str) -> str:
     raise RuntimeError(f"No RSS feed configured for site: {site}")
 
 
+def _read_feed_cached(
+    feed_url: str,
+    site: str,
+    state_path: Path,
+    since: datetime,
+) -> list[dict[str, Any]] | None:
+    """
+    Conditional feed read: a 304 returns the cached parse without touching
+    parse_rss(); a changed feed is parsed (up to `since`) and cached with
+    its validators. A cached parse that stopped at a later cutoff than
+    `since` is not reused. None when the feed does not parse.
+    """
+    feeds = FeedCache(state_path)
+    try:
+        cached = feeds.get(feed_url)
+        if cached is not None and cached.parsed_since is not None and since < cached.parsed_since:
+            cached = None
+        resp = _fetch_feed(feed_url, cached)
+        if resp.status == 304 and cached is not None:
+            return cached.items
+
+        try:
+            discovered = list(iter_rss(_decode(resp.body), site, since=since))
+        except Exception:
+            # Broken RSS / HTML instead of XML / transient error
+            return None
+
+        etag = resp.headers.get("etag")
+        last_modified = resp.headers.get("last-modified")
+        if etag or last_modified:
+            feeds.put(
+                feed_url,
+                CachedFeed(
+                    etag=etag,
+                    last_modified=last_modified,
+                    items=discovered,
+                    parsed_since=since,
+                ),
+            )
+        return discovered
+    finally:
+        feeds.close()
+
+
 # ============================================================
 # Site-specific article extraction
 # ============================================================
@@ -177,6 +319,44 @@ def extract_3dnews_article_text(html: str) -> str:
     return parser.get_text().strip()
 
 
+# ============================================================
+# Concurrent article fetching
+# ============================================================
+
+def _fetch_article_text(
+    url: str,
+    site_key: str,
+    host_slots: dict[str, threading.BoundedSemaphore],
+    deadline: float,
+    article_cache: ArticleCache | None = None,
+) -> str:
+    """
+    Full article text for one RSS item ("" on any failure), served from the
+    article cache when present, else fetched while holding one of its
+    host's slots and never past the site deadline.
+    """
+    if article_cache is not None:
+        cached = article_cache.get(url)
+        if cached is not None:
+            return cached
+
+    text = ""
+    with host_slots[urlparse(url).netloc.lower()]:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return ""
+        try:
+            html = fetch_url(url, timeout_seconds=min(ARTICLE_TIMEOUT_SECONDS, remaining))
+            if site_key == "3dnews.ru":
+                text = extract_3dnews_article_text(html)
+        except Exception:
+            text = ""
+
+    if text and article_cache is not None:
+        article_cache.put(url, text)
+    return text
+
+
 # ============================================================
 # Public API (task.yaml v1)
 # ============================================================
@@ -186,13 +366,58 @@ def read_site_items(
     site: str,
     lookback_hours: int,
     now: datetime | None = None,
+    max_workers: int = DEFAULT_ARTICLE_WORKERS,
+    per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+    deadline_seconds: float = DEFAULT_SITE_DEADLINE_SECONDS,
+    state_path: str | Path | None = None,
+    article_cache: ArticleCache | None = None,
 ) -> list[dict[str, Any]]:
     """
     Public v1 API.
 
-    site            - URL or hostname from task.yaml
-    lookback_hours  - common lookback window
-    now             - optional override (for testing)
+    site              - URL or hostname from task.yaml
+    lookback_hours    - common lookback window
+    now               - optional override (for testing)
+    max_workers       - article pages fetched concurrently
+    per_host_limit    - concurrent fetches per article host
+    deadline_seconds  - overall article budget for the site; late articles
+                        keep their RSS summary
+    state_path        - optional SQLite file for feed validators: the feed is
+                        fetched with If-None-Match / If-Modified-Since and a
+                        304 reuses the items parsed last time
+    article_cache     - optional ArticleCache: extracted article text is
+                        reused instead of re-downloading the page
+    """
+
+    return list(
+        iter_site_items(
+            site=site,
+            lookback_hours=lookback_hours,
+            now=now,
+            max_workers=max_workers,
+            per_host_limit=per_host_limit,
+            deadline_seconds=deadline_seconds,
+            state_path=state_path,
+            article_cache=article_cache,
+        )
+    )
+
+
+def iter_site_items(
+    *,
+    site: str,
+    lookback_hours: int,
+    now: datetime | None = None,
+    max_workers: int = DEFAULT_ARTICLE_WORKERS,
+    per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+    deadline_seconds: float = DEFAULT_SITE_DEADLINE_SECONDS,
+    state_path: str | Path | None = None,
+    article_cache: ArticleCache | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Streaming form of read_site_items(): articles are fetched by a bounded
+    thread pool, items are yielded in feed order as soon as their article
+    (and every earlier one) is done.
     """
 
     if lookback_hours <= 0:
@@ -202,15 +427,19 @@ def read_site_items(
     since = now_dt - timedelta(hours=lookback_hours)
 
     feed_url = _get_feed_url(site)
-    rss_xml = fetch_url(feed_url)
-    
-    try:
-        discovered = parse_rss(rss_xml, site)
-    except Exception:
-        # Broken RSS / HTML instead of XML / transient error
-        return []
-    out: list[dict[str, Any]] = []
+    if state_path:
+        discovered = _read_feed_cached(feed_url, site, Path(state_path), since)
+    else:
+        rss_xml = fetch_url(feed_url)
+        try:
+            discovered = list(iter_rss(rss_xml, site, since=since))
+        except Exception:
+            # Broken RSS / HTML instead of XML / transient error
+            discovered = None
+    if discovered is None:
+        return
 
+    fresh: list[tuple[dict[str, Any], datetime]] = []
     for it in discovered:
         dt = it.get("date")
         if not isinstance(dt, datetime):
@@ -220,18 +449,35 @@ def read_site_items(
         if dt < since:
             continue
 
-        full_text = ""
-        try:
-            html = fetch_url(it["url"])
-            if _normalize_site(site) == "3dnews.ru":
-                full_text = extract_3dnews_article_text(html)
-        except Exception:
-            full_text = ""
+        fresh.append((it, dt))
 
-        text = full_text or it.get("text", "")
+    if not fresh:
+        return
 
-        out.append(
-            {
+    site_key = _normalize_site(site)
+    host_slots = {
+        urlparse(it["url"]).netloc.lower(): threading.BoundedSemaphore(max(per_host_limit, 1))
+        for it, _ in fresh
+    }
+    deadline = time.monotonic() + deadline_seconds
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(fresh))))
+    try:
+        futures = [
+            executor.submit(
+                _fetch_article_text, it["url"], site_key, host_slots, deadline, article_cache
+            )
+            for it, _ in fresh
+        ]
+        for (it, dt), future in zip(fresh, futures):
+            try:
+                full_text = future.result(timeout=max(deadline - time.monotonic(), 0))
+            except FutureTimeoutError:
+                full_text = ""
+
+            text = full_text or it.get("text", "")
+
+            yield {
                 "source": "web",
                 "site": site,
                 "title": str(it.get("title", "")),
@@ -239,6 +485,6 @@ def read_site_items(
                 "text": text,
                 "url": str(it.get("url", "")),
             }
-        )
-
-    return out
+    finally:
+        # Late fetches are abandoned, not awaited.
+        executor.shutdown(wait=False, cancel_futures=True)
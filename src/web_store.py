@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# ============================================================
+# Models
+# ============================================================
+
+@dataclass(frozen=True)
+class CachedFeed:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    items: List[Dict[str, Any]]     # parse_rss() output of the cached document
+    parsed_since: Optional[datetime] = None     # parse stopped at this cutoff (None = whole feed)
+
+
+def _encode_items(items: List[Dict[str, Any]]) -> str:
+    return json.dumps(
+        [
+            {**item, "date": item["date"].isoformat() if isinstance(item.get("date"), datetime) else None}
+            for item in items
+        ],
+        ensure_ascii=False,
+    )
+
+
+def _decode_items(raw: str) -> List[Dict[str, Any]]:
+    items = json.loads(raw)
+    for item in items:
+        if item.get("date"):
+            item["date"] = datetime.fromisoformat(item["date"])
+    return items
+
+
+# ============================================================
+# Store
+# ============================================================
+
+class FeedCache:
+    """
+    Conditional-GET state for RSS feeds (SQLite): per feed URL the
+    validators (ETag / Last-Modified) of the last full response and the
+    items parsed from it, reused as-is when the server answers 304.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS feeds (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                items TEXT NOT NULL,
+                parsed_since TEXT
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[CachedFeed]:
+        row = self._conn.execute(
+            "SELECT etag, last_modified, items, parsed_since FROM feeds WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        return CachedFeed(
+            etag=row[0],
+            last_modified=row[1],
+            items=_decode_items(row[2]),
+            parsed_since=datetime.fromisoformat(row[3]) if row[3] else None,
+        )
+
+    def put(self, url: str, feed: CachedFeed) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO feeds (url, etag, last_modified, items, parsed_since) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                url,
+                feed.etag,
+                feed.last_modified,
+                _encode_items(feed.items),
+                feed.parsed_since.isoformat() if feed.parsed_since else None,
+            ),
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+# ============================================================
+# Article text cache
+# ============================================================
+
+# Article text is kept this long and the cache directory is kept under this size.
+DEFAULT_ARTICLE_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_ARTICLE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class ArticleCache:
+    """
+    On-disk cache of extracted article text (not raw HTML), one file per
+    URL under a content address (sha256 of the URL).
+
+    - Entries older than ttl_seconds (file mtime = stored at) are misses
+    - The directory is kept under max_bytes by evicting the least recently
+      used entries (access time is set explicitly on every hit)
+    - Thread-safe; counters() reports hits / misses / evictions
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        ttl_seconds: float = DEFAULT_ARTICLE_TTL_SECONDS,
+        max_bytes: int = DEFAULT_ARTICLE_CACHE_BYTES,
+    ) -> None:
+        self.directory = Path(directory)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Dict[Path, Tuple[int, float]] | None = None   # path -> (size, last used)
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.txt"
+
+    def _load_index(self) -> Dict[Path, Tuple[int, float]]:
+        if self._index is None:
+            self._index = {}
+            if self.directory.exists():
+                for path in self.directory.glob("*/*.txt"):
+                    stat = path.stat()
+                    self._index[path] = (stat.st_size, stat.st_atime)
+        return self._index
+
+    def _drop(self, path: Path) -> None:
+        self._load_index().pop(path, None)
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def get(self, url: str) -> Optional[str]:
+        path = self._path(url)
+        now = time.time()
+        with self._lock:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                self._counters["misses"] += 1
+                return None
+            if now - stat.st_mtime > self.ttl_seconds:
+                self._drop(path)
+                self._counters["misses"] += 1
+                return None
+
+            text = path.read_text(encoding="utf-8")
+            os.utime(path, (now, stat.st_mtime))
+            self._load_index()[path] = (stat.st_size, now)
+            self._counters["hits"] += 1
+            return text
+
+    def put(self, url: str, text: str) -> None:
+        path = self._path(url)
+        data = text.encode("utf-8")
+        with self._lock:
+            index = self._load_index()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            index[path] = (len(data), time.time())
+
+            total = sum(size for size, _ in index.values())
+            for victim in sorted(index, key=lambda p: index[p][1]):
+                if total <= self.max_bytes:
+                    break
+                total -= index[victim][0]
+                self._drop(victim)
+                self._counters["evictions"] += 1
+
+    def counters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
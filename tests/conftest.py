@@ -15,9 +15,12 @@ except ModuleNotFoundError:
 
     telethon_stub = types.ModuleType("telethon")
     telethon_sync_stub = types.ModuleType("telethon.sync")
+    telethon_errors_stub = types.ModuleType("telethon.errors")
     telethon_tl_stub = types.ModuleType("telethon.tl")
     telethon_tl_functions_stub = types.ModuleType("telethon.tl.functions")
     telethon_tl_messages_stub = types.ModuleType("telethon.tl.functions.messages")
+    telethon_tl_types_stub = types.ModuleType("telethon.tl.types")
+    telethon_events_stub = types.ModuleType("telethon.events")
 
     class TelegramClient:
         def __init__(self, *args, **kwargs):
@@ -32,15 +35,91 @@ except ModuleNotFoundError:
         def __call__(self, *args, **kwargs):
             raise RuntimeError("TelegramClient stub called in tests")
 
-    class GetHistoryRequest:
+    class AsyncTelegramClient:
         def __init__(self, *args, **kwargs):
             pass
 
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+        async def __call__(self, *args, **kwargs):
+            raise RuntimeError("TelegramClient stub called in tests")
+
+    class GetHistoryRequest:
+        def __init__(self, *args, **kwargs):
+            self.__dict__.update(kwargs)
+
+    class NewMessage:
+        def __init__(self, chats=None, **kwargs):
+            self.chats = chats
+
+    class SearchRequest(GetHistoryRequest):
+        pass
+
+    class InputMessagesFilterEmpty:
+        pass
+
+    class InputPeerChannel:
+        def __init__(self, channel_id, access_hash):
+            self.channel_id = channel_id
+            self.access_hash = access_hash
+
+        def __eq__(self, other):
+            return isinstance(other, InputPeerChannel) and vars(self) == vars(other)
+
+        def __hash__(self):
+            return hash((self.channel_id, self.access_hash))
+
+    class RPCError(Exception):
+        pass
+
+    class ChannelInvalidError(RPCError):
+        pass
+
+    class ChannelPrivateError(RPCError):
+        pass
+
+    class PeerIdInvalidError(RPCError):
+        pass
+
+    class UsernameInvalidError(RPCError):
+        pass
+
+    class UsernameNotOccupiedError(RPCError):
+        pass
+
+    class FloodWaitError(RPCError):
+        def __init__(self, request=None, capture=0):
+            super().__init__(f"A wait of {capture} seconds is required")
+            self.seconds = capture
+
+    telethon_stub.TelegramClient = AsyncTelegramClient
+    telethon_stub.events = telethon_events_stub
+    telethon_events_stub.NewMessage = NewMessage
     telethon_sync_stub.TelegramClient = TelegramClient
+    telethon_errors_stub.RPCError = RPCError
+    telethon_errors_stub.FloodWaitError = FloodWaitError
+    for error in (
+        ChannelInvalidError,
+        ChannelPrivateError,
+        PeerIdInvalidError,
+        UsernameInvalidError,
+        UsernameNotOccupiedError,
+    ):
+        setattr(telethon_errors_stub, error.__name__, error)
+    telethon_tl_types_stub.InputPeerChannel = InputPeerChannel
+    telethon_tl_types_stub.InputMessagesFilterEmpty = InputMessagesFilterEmpty
+    telethon_tl_messages_stub.SearchRequest = SearchRequest
     telethon_tl_messages_stub.GetHistoryRequest = GetHistoryRequest
 
     sys.modules["telethon"] = telethon_stub
     sys.modules["telethon.sync"] = telethon_sync_stub
+    sys.modules["telethon.errors"] = telethon_errors_stub
     sys.modules["telethon.tl"] = telethon_tl_stub
     sys.modules["telethon.tl.functions"] = telethon_tl_functions_stub
     sys.modules["telethon.tl.functions.messages"] = telethon_tl_messages_stub
+    sys.modules["telethon.tl.types"] = telethon_tl_types_stub
+    sys.modules["telethon.events"] = telethon_events_stub
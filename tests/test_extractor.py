@@ -48,12 +48,13 @@ def test_case_insensitive_matching_and_output_fields():
         }
     ]
     result = extract(messages, ["alpha"])
-    assert result == [
+    assert [snippet.to_dict() for snippet in result] == [
         {
             "post_id": 3,
             "date": "2025-12-03T00:00:00",
             "url": "https://t.me/test/3",
             "keyword": "alpha",
+            "keywords": ["alpha"],
             "snippet": "Alpha appears here.",
         }
     ]
@@ -71,3 +72,82 @@ def test_input_messages_not_modified():
     original = copy.deepcopy(messages)
     extract(messages, ["keyword"])
     assert messages == original
+
+
+def test_match_results_are_reused_without_rescanning():
+    from src.matcher import match
+
+    messages = [
+        {
+            "id": 5,
+            "date": "2025-12-05T00:00:00",
+            "text": "Intro.\n\nKeyword in second paragraph.",
+            "url": "https://t.me/test/5",
+        }
+    ]
+    matched = match(messages, ["keyword"], with_hits=True)
+    assert [s.to_dict() for s in extract(matched, ["keyword"])] == [
+        s.to_dict() for s in extract(messages, ["keyword"])
+    ]
+    assert extract(matched, ["keyword"])[0]["snippet"] == "Keyword in second paragraph."
+
+
+def test_first_hit_across_paragraphs_falls_back_to_later_hits():
+    from src.matcher import match
+
+    messages = [{"id": 7, "date": None, "url": "u", "text": "a\n\nb c\nb"}]
+    matched = match(messages, ["\nb"], with_hits=True)
+
+    assert matched[0].hits == {"\nb": [(2, 4)]}
+    assert extract(matched, ["\nb"])[0]["snippet"] == "b c\nb"
+
+
+def test_segments_shared_across_keywords():
+    text = (
+        "Биржа сообщила о сбое.\n\n"
+        "Второй абзац. Взлом подтверждён. Регулятор молчит.\n\n"
+        "Dangling sec. next"
+    )
+    messages = [{"id": 6, "date": None, "url": "u", "text": text}]
+    result = extract(messages, ["взлом", "биржа", "sec. next"])
+
+    assert [r["keyword"] for r in result] == ["взлом", "биржа", "sec. next"]
+    assert result[0]["snippet"] == "Второй абзац. Взлом подтверждён. Регулятор молчит."
+    assert result[1]["snippet"] == "Биржа сообщила о сбое."
+    assert result[2]["snippet"] == "Dangling sec. next"
+
+
+def test_keywords_sharing_a_window_are_coalesced():
+    text = (
+        "Биржа приостановила вывод.\n\n"
+        "Взлом биржи и утечка данных подтверждены.\n\n"
+        "Регулятор начал проверку."
+    )
+    messages = [{"id": 7, "date": None, "url": "u", "text": text}]
+    result = extract(messages, ["регулятор", "утечка", "биржа", "взлом"])
+
+    assert [(r["keyword"], r["keywords"]) for r in result] == [
+        ("регулятор", ["регулятор"]),
+        ("утечка", ["утечка", "взлом"]),
+        ("биржа", ["биржа"]),
+    ]
+    assert result[1]["snippet"] == "Взлом биржи и утечка данных подтверждены."
+
+
+def test_overlapping_sentence_windows_are_merged():
+    from src.extractor import _coalesce
+
+    windows = [((1, 0, 2), "a"), ((1, 4, 6), "b"), ((1, 2, 4), "c"), ((0, 1, 1), "d")]
+    assert _coalesce(windows) == [((1, 0, 6), ["a", "b", "c"]), ((0, 1, 1), ["d"])]
+
+
+def test_snippets_reference_source_text_by_offsets():
+    text = "Intro.\n\nSecond paragraph with keyword."
+    messages = [{"id": 8, "date": None, "url": "u", "text": text}]
+    snippet = extract(messages, ["keyword"])[0]
+
+    assert not hasattr(snippet, "__dict__")
+    assert snippet.source is text
+    assert snippet.spans == ((8, len(text)),)
+    assert snippet["snippet"] == "Second paragraph with keyword."
+    assert snippet.get("missing", "default") == "default"
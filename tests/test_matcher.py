@@ -0,0 +1,56 @@
+from src import matcher
+from src.matcher import match
+
+
+def test_empty_inputs_return_empty_list():
+    assert match([], ["alpha"]) == []
+    assert match([{"text": "alpha"}], []) == []
+
+
+def test_case_insensitive_and_returns_same_objects():
+    messages = [
+        {"id": 1, "text": "ALPHA breach"},
+        {"id": 2, "text": "nothing here"},
+        {"id": 3, "text": ""},
+        {"id": 4},
+    ]
+    result = match(messages, ["Alpha"])
+    assert result == [messages[0]]
+    assert result[0] is messages[0]
+
+
+def test_automaton_agrees_with_substring_scan(monkeypatch):
+    keywords = ["hack", "sec", "security", "etf", "ban", "ФРС", "взлом"]
+    messages = [
+        {"text": "New SECURITY incident"},
+        {"text": "Bitcoin ETF approved"},
+        {"text": "Urban gardening"},
+        {"text": "Крупный ВЗЛОМ биржи"},
+        {"text": "Заявление фрс"},
+        {"text": "no keywords at all"},
+    ]
+    expected = match(messages, keywords)
+
+    monkeypatch.setattr(matcher, "AUTOMATON_MIN_KEYWORDS", 0)
+    matcher.compile_keywords.cache_clear()
+
+    assert match(messages, keywords) == expected
+    assert [m["text"] for m in expected] == [
+        "New SECURITY incident",
+        "Bitcoin ETF approved",
+        "Urban gardening",
+        "Крупный ВЗЛОМ биржи",
+        "Заявление фрс",
+    ]
+
+
+def test_with_hits_reports_offsets_into_original_text():
+    messages = [
+        {"id": 1, "text": "SEC sues exchange. The sec filing"},
+        {"id": 2, "text": "unrelated"},
+    ]
+    result = match(messages, ["sec", "ban"], with_hits=True)
+
+    assert len(result) == 1
+    assert result[0].message is messages[0]
+    assert result[0].hits == {"sec": [(0, 3)]}
@@ -3,6 +3,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 
 from src import extractor, main, matcher, notifier, status, storage, tg_reader
+from src.profile_mapper import main as profile_mapper_main
 
 
 def test_pipeline_imports() -> None:
@@ -26,17 +27,52 @@ def test_function_signatures_match_call_sites() -> None:
     assert read_params[:2] == ["channels", "since"]
 
 
+_TASK_YAML = """\
+version: v1
+lookback_hours: 24
+keywords: [alpha, breach]
+sources:
+  - type: telegram
+    channels: ["@test"]
+limits:
+  max_items: 10
+"""
+
+
+def _isolated_run(tmp_path: Path, monkeypatch) -> None:
+    """
+    Runs main() inside tmp_path: input.json, a catalog and a stubbed
+    profile mapper that writes the fixture task.yaml.
+    """
+    monkeypatch.delenv("TASK_FILE", raising=False)
+    monkeypatch.chdir(tmp_path)
+
+    (tmp_path / "runtime" / "input").mkdir(parents=True)
+    (tmp_path / "runtime" / "input" / "input.json").write_text("{}", encoding="utf-8")
+    (tmp_path / "data" / "albion").mkdir(parents=True)
+    (tmp_path / "data" / "albion" / "catalog.json").write_text('{"items": ["T4_BAG"]}', encoding="utf-8")
+
+    def fake_run_mapper(*, input_path, output_dir):
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        (Path(output_dir) / "task.yaml").write_text(_TASK_YAML, encoding="utf-8")
+
+    monkeypatch.setattr(profile_mapper_main, "run", fake_run_mapper)
+    monkeypatch.setattr(main, "write_task_snapshot", lambda task: None)
+    monkeypatch.setattr(main, "SEEN_STORE_PATH", tmp_path / "seen.sqlite3")
+    monkeypatch.setattr(main, "ARTICLE_CACHE_DIR", tmp_path / "articles")
+
+
 def test_main_smoke(tmp_path: Path, monkeypatch) -> None:
     """
     Smoke test for main pipeline with task.yaml v1 as single source of truth.
-    No ENV usage. No network. No storage side effects.
+    No ENV usage. No network. No storage side effects (runs in tmp_path).
     """
 
     calls = {}
-    monkeypatch.delenv("TASK_FILE", raising=False)
+    _isolated_run(tmp_path, monkeypatch)
 
     # --- telegram reader mock ---
-    def fake_read_messages(*, channels, since, until, limit_per_channel):
+    def fake_read_messages(*, channels, since, until, limit_per_channel, **options):
         calls["read_messages"] = {
             "channels": channels,
             "since": since,
@@ -53,11 +89,11 @@ def test_main_smoke(tmp_path: Path, monkeypatch) -> None:
         ]
 
     # --- web reader mock ---
-    def fake_read_site_items(*, site, feed_url, lookback_hours):
+    def fake_read_site_items(*, site, lookback_hours, **options):
         return []
 
     # --- matcher mock ---
-    def fake_match(messages, keywords):
+    def fake_match(messages, keywords, *, with_hits=False):
         calls["match"] = {
             "messages": messages,
             "keywords": keywords,
@@ -66,6 +102,7 @@ def test_main_smoke(tmp_path: Path, monkeypatch) -> None:
 
     # --- extractor mock ---
     def fake_extract(messages, keywords):
+        messages = list(messages)
         calls["extract"] = {
             "messages": messages,
             "keywords": keywords,
@@ -81,13 +118,15 @@ def test_main_smoke(tmp_path: Path, monkeypatch) -> None:
         ]
 
     # --- storage mock (new contract) ---
-    def fake_save(snippets, *, output_dir, lookback_hours, max_items):
+    def fake_save(snippets, *, output_dir, lookback_hours, max_items, **options):
         calls["save"] = {
-            "snippets": snippets,
+            "snippets": list(snippets),
             "output_dir": output_dir,
             "lookback_hours": lookback_hours,
             "max_items": max_items,
+            "raw_format": options.get("raw_format"),
         }
+        return calls["save"]["snippets"]
 
     # --- status mocks ---
     def fake_mark_running(*, result_path=None):
@@ -100,10 +139,10 @@ def test_main_smoke(tmp_path: Path, monkeypatch) -> None:
         raise AssertionError(f"Pipeline errored: {error}")
 
     # --- patch ---
-    monkeypatch.setattr(main, "read_messages", fake_read_messages)
-    monkeypatch.setattr(main, "read_site_items", fake_read_site_items)
-    monkeypatch.setattr(main, "match", fake_match)
-    monkeypatch.setattr(main, "extract", fake_extract)
+    monkeypatch.setattr(main, "iter_messages", fake_read_messages)
+    monkeypatch.setattr(main, "iter_site_items", fake_read_site_items)
+    monkeypatch.setattr(main, "iter_match", fake_match)
+    monkeypatch.setattr(main, "iter_extract", fake_extract)
     monkeypatch.setattr(main, "save", fake_save)
     monkeypatch.setattr(main, "mark_running", fake_mark_running)
     monkeypatch.setattr(main, "mark_done", fake_mark_done)
@@ -114,7 +153,7 @@ def test_main_smoke(tmp_path: Path, monkeypatch) -> None:
 
     # --- assertions ---
     assert "read_messages" in calls
-    assert calls["read_messages"]["channels"], "channels must come from task.yaml"
+    assert calls["read_messages"]["channels"] == ["@test"], "channels must come from task.yaml"
 
     assert "match" in calls
     assert "extract" in calls
@@ -122,5 +161,43 @@ def test_main_smoke(tmp_path: Path, monkeypatch) -> None:
 
     assert calls["save"]["lookback_hours"] > 0
     assert calls["save"]["max_items"] > 0
+    assert calls["save"]["raw_format"] == "json"
 
     assert calls["done"]["matched"] == 1
+    assert calls["done"]["telegram"] == {"deferred": [], "dropped": [], "sessions": {}}
+    assert calls["done"]["article_cache"] == {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def test_reader_failure_mid_stream_leaves_outputs_and_seen_store_untouched(
+    tmp_path: Path, monkeypatch
+) -> None:
+    errors = []
+    _isolated_run(tmp_path, monkeypatch)
+    (tmp_path / "output").mkdir()
+    (tmp_path / "output" / "raw.json").write_text("[previous]", encoding="utf-8")
+    (tmp_path / "output" / "result.md").write_text("# previous\n", encoding="utf-8")
+
+    def failing_read_messages(**options):
+        yield {
+            "id": 1,
+            "date": datetime.now(timezone.utc),
+            "text": "alpha security breach",
+            "url": "https://t.me/test/1",
+        }
+        raise RuntimeError("reader died")
+
+    monkeypatch.setattr(main, "iter_messages", failing_read_messages)
+    monkeypatch.setattr(main, "mark_running", lambda *, result_path=None: "started")
+    monkeypatch.setattr(main, "mark_done", lambda **kw: errors.append("done"))
+    monkeypatch.setattr(main, "mark_error", lambda *, error, **kw: errors.append(error))
+
+    main.main()
+
+    assert errors == ["reader died"]
+    assert (tmp_path / "output" / "raw.json").read_text(encoding="utf-8") == "[previous]"
+    assert (tmp_path / "output" / "result.md").read_text(encoding="utf-8") == "# previous\n"
+    assert not (tmp_path / "output" / "raw.json.tmp").exists()
+
+    store = storage.SeenStore(tmp_path / "seen.sqlite3", lookback_hours=24)
+    assert store._conn.execute("SELECT COUNT(*) FROM seen").fetchone() == (0,)
+    store.close()
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import json
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+import pytest
+
 from src import storage
 
 
@@ -110,3 +112,344 @@ def test_save_result_md_contains_core_fields(tmp_path: Path) -> None:
     assert "2024-01-01" in content
     assert "https://example.com" in content
     assert "Some text" in content
+
+
+def test_save_scores_with_all_coalesced_keywords(tmp_path: Path) -> None:
+    output_dir = tmp_path / "output"
+    snippets = [
+        {
+            "date": _dt(),
+            "keyword": "alpha",
+            "keywords": ["alpha", "beta"],
+            "url": "https://example.com/1",
+            "snippet": "alpha beta beta",
+        }
+    ]
+
+    storage.save(
+        snippets,
+        str(output_dir),
+        lookback_hours=LOOKBACK_HOURS,
+        max_items=MAX_ITEMS,
+    )
+
+    raw_data = json.loads((output_dir / "raw.json").read_text(encoding="utf-8"))
+    assert raw_data[0]["keywords"] == ["alpha", "beta"]
+    assert snippets[0]["importance_score"] == 1 + 2 + 2 * 2
+
+
+def test_save_materializes_snippet_objects(tmp_path: Path) -> None:
+    from src.extractor import extract
+
+    output_dir = tmp_path / "output"
+    messages = [
+        {
+            "id": 1,
+            "date": _dt(),
+            "url": "https://t.me/test/1",
+            "text": "Intro.\n\nAlpha breach confirmed.",
+        }
+    ]
+
+    storage.save(
+        extract(messages, ["alpha"]),
+        str(output_dir),
+        lookback_hours=LOOKBACK_HOURS,
+        max_items=MAX_ITEMS,
+    )
+
+    raw_data = json.loads((output_dir / "raw.json").read_text(encoding="utf-8"))
+    assert raw_data[0]["snippet"] == "Alpha breach confirmed."
+    assert raw_data[0]["keywords"] == ["alpha"]
+    content = (output_dir / "result.md").read_text(encoding="utf-8")
+    assert "Alpha breach confirmed." in content
+
+
+def test_save_streams_generator_with_bounded_top_k(tmp_path: Path) -> None:
+    output_dir = tmp_path / "output"
+    consumed = []
+
+    def snippets():
+        for i in range(50):
+            item = {
+                "date": _dt(),
+                "keyword": "alpha",
+                "url": f"https://t.me/test/{i}",
+                "snippet": "alpha " * (i % 5 + 1) + str(i),
+            }
+            consumed.append(item)
+            yield item
+
+    storage.save(
+        snippets(),
+        str(output_dir),
+        lookback_hours=LOOKBACK_HOURS,
+        max_items=3,
+        include_keywords=["ALPHA"],
+    )
+
+    raw_data = json.loads((output_dir / "raw.json").read_text(encoding="utf-8"))
+    assert len(raw_data) == 50 == len(consumed)
+
+    content = (output_dir / "result.md").read_text(encoding="utf-8")
+    assert "## Items (3)" in content
+    for i in (4, 9, 14):
+        assert f"https://t.me/test/{i}\n" in content
+
+
+def test_save_failing_mid_stream_keeps_previous_output(tmp_path: Path) -> None:
+    first = [{"date": _dt(), "keyword": "alpha", "url": "u1", "snippet": "alpha first"}]
+    storage.save(
+        first,
+        str(tmp_path),
+        lookback_hours=LOOKBACK_HOURS,
+        max_items=MAX_ITEMS,
+        include_keywords=["alpha"],
+    )
+    raw_before = (tmp_path / "raw.json").read_text(encoding="utf-8")
+    result_before = (tmp_path / "result.md").read_text(encoding="utf-8")
+
+    def failing_reader():
+        yield {"date": _dt(), "keyword": "alpha", "url": "u2", "snippet": "alpha second"}
+        raise RuntimeError("reader died")
+
+    with pytest.raises(RuntimeError):
+        storage.save(
+            failing_reader(),
+            str(tmp_path),
+            lookback_hours=LOOKBACK_HOURS,
+            max_items=MAX_ITEMS,
+            include_keywords=["alpha"],
+        )
+
+    assert (tmp_path / "raw.json").read_text(encoding="utf-8") == raw_before
+    assert (tmp_path / "result.md").read_text(encoding="utf-8") == result_before
+    assert not (tmp_path / "raw.json.tmp").exists()
+
+
+def test_save_ndjson_writes_one_record_per_line(tmp_path: Path) -> None:
+    output_dir = tmp_path / "output"
+    snippets = [
+        {"date": _dt(), "keyword": "alpha", "url": "u1", "snippet": "a\nb"},
+        {"date": _dt(), "keyword": "alpha", "url": "u2", "snippet": "c"},
+    ]
+
+    storage.save(
+        snippets,
+        str(output_dir),
+        lookback_hours=LOOKBACK_HOURS,
+        max_items=MAX_ITEMS,
+        raw_format="ndjson",
+    )
+
+    lines = (output_dir / "raw.ndjson").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["url"] for line in lines] == ["u1", "u2"]
+    assert json.loads(lines[0])["date"].startswith("2024-01-01T")
+    assert not (output_dir / "raw.json").exists()
+
+
+def test_prepare_items_top_k_matches_stable_full_sort() -> None:
+    snippets = [
+        {
+            "date": datetime(2024, 1, 1, i % 3, tzinfo=timezone.utc),
+            "keyword": "alpha",
+            "url": f"u{i}",
+            "snippet": "alpha " * (i % 4) + f"#{i}",
+        }
+        for i in range(40)
+    ]
+    expected = sorted(
+        (dict(item, importance_score=storage._compute_importance(item, ["alpha"], _dt())) for item in snippets),
+        key=lambda x: (x["importance_score"], x["date"]),
+        reverse=True,
+    )[:7]
+
+    result = storage._prepare_items(snippets, include_keywords=["alpha"], max_items=7)
+
+    assert [item["url"] for item in result] == [item["url"] for item in expected]
+
+
+def test_prepare_items_with_zero_max_items_is_empty() -> None:
+    snippets = [{"date": _dt(), "keyword": "alpha", "url": "u1", "snippet": "alpha"}]
+
+    assert storage._prepare_items(snippets, include_keywords=["alpha"], max_items=0) == []
+
+
+def _reference_importance(item: dict, include_keywords: list[str], now: datetime) -> int:
+    # Per-keyword rescan implementation the single-pass scorer must match.
+    score = 0
+    text = item["snippet"].lower()
+    for kw in include_keywords:
+        score += text.count(kw.lower())
+    first_line = item["snippet"].splitlines()[0].lower() if item["snippet"] else ""
+    for kw in include_keywords:
+        if kw.lower() in first_line:
+            score += 2
+    l = len(item["snippet"])
+    if l > 500:
+        score += 1
+    if l > 1000:
+        score += 2
+    age_hours = (now - item["date"]).total_seconds() / 3600
+    if age_hours < 6:
+        score += 2
+    elif age_hours < 12:
+        score += 1
+    return score
+
+
+def test_compute_importance_matches_reference_scores(monkeypatch) -> None:
+    import random
+
+    from src import matcher
+
+    rng = random.Random(9)
+    now = _dt()
+    keywords = ["aa", "sec", "ban", "взлом", "etf"]
+    parts = ["aa", "a", "SEC", "urban", "Взлом", "etf", " ", "\n", "\r\n", " ", "x" * 300]
+
+    for threshold in (matcher.AUTOMATON_MIN_KEYWORDS, 0):
+        monkeypatch.setattr(matcher, "AUTOMATON_MIN_KEYWORDS", threshold)
+        monkeypatch.setattr(storage, "AUTOMATON_MIN_KEYWORDS", threshold)
+        for _ in range(300):
+            item = {
+                "snippet": "".join(rng.choice(parts) for _ in range(rng.randint(0, 12))),
+                "date": now - timedelta(hours=rng.randint(0, 24)),
+            }
+            assert storage._compute_importance(item, keywords, now) == _reference_importance(
+                item, keywords, now
+            )
+
+
+def test_seen_store_skips_items_from_previous_runs(tmp_path: Path) -> None:
+    path = tmp_path / "state" / "seen.sqlite3"
+    now = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    first = [
+        {"url": "https://t.me/a/1", "text": "Exchange hacked", "date": now},
+        {"url": "https://t.me/a/2", "text": "ETF approved", "date": now},
+    ]
+
+    store = storage.SeenStore(path, lookback_hours=24, now=now)
+    assert list(store.filter(first)) == first
+    store.commit(first)
+    store.close()
+
+    second = [
+        {"url": "https://t.me/a/1", "text": "Exchange hacked (edited)", "date": now},
+        {"url": "https://t.me/b/9", "text": "etf   APPROVED", "date": now},
+        {"url": "https://t.me/a/3", "text": "New outage", "date": now},
+    ]
+    store = storage.SeenStore(path, lookback_hours=24, now=now)
+    assert list(store.filter(second)) == [second[2]]
+    assert store.skipped == 2
+    store.close()
+
+
+def test_seen_store_evicts_entries_outside_lookback(tmp_path: Path) -> None:
+    path = tmp_path / "seen.sqlite3"
+    now = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    item = {"url": "u", "text": "t", "date": now - timedelta(hours=10)}
+
+    store = storage.SeenStore(path, lookback_hours=24, now=now)
+    list(store.filter([item]))
+    store.commit([item])
+    store.close()
+
+    store = storage.SeenStore(path, lookback_hours=6, now=now)
+    assert list(store.filter([item])) == [item]
+    store.close()
+
+
+def test_seen_store_does_not_persist_without_commit(tmp_path: Path) -> None:
+    path = tmp_path / "seen.sqlite3"
+    item = {"url": "u", "text": "t", "date": _dt()}
+
+    store = storage.SeenStore(path, lookback_hours=24, now=_dt())
+    list(store.filter([item]))
+    store.close()
+
+    store = storage.SeenStore(path, lookback_hours=24, now=_dt())
+    assert list(store.filter([item])) == [item]
+    store.close()
+
+
+def test_seen_store_persists_only_reported_items(tmp_path: Path) -> None:
+    path = tmp_path / "seen.sqlite3"
+    items = [{"url": f"u{i}", "text": f"text {i}", "date": _dt()} for i in range(3)]
+
+    store = storage.SeenStore(path, lookback_hours=24, now=_dt())
+    list(store.filter(items))
+    store.commit([{"url": "u1", "snippet": "text 1"}])
+    store.close()
+
+    store = storage.SeenStore(path, lookback_hours=24, now=_dt())
+    assert list(store.filter(items)) == [items[0], items[2]]
+    store.close()
+
+
+def test_seen_store_is_scoped_by_keyword_set(tmp_path: Path) -> None:
+    path = tmp_path / "seen.sqlite3"
+    item = {"url": "u", "text": "t", "date": _dt()}
+    scope = storage.keyword_scope(["Hack", "etf"])
+    assert scope == storage.keyword_scope(["ETF", "hack"])
+
+    store = storage.SeenStore(path, lookback_hours=24, now=_dt(), scope=scope)
+    list(store.filter([item]))
+    store.commit([item])
+    store.close()
+
+    store = storage.SeenStore(path, lookback_hours=24, now=_dt(), scope=storage.keyword_scope(["hack"]))
+    assert list(store.filter([item])) == [item]
+    store.close()
+
+    store = storage.SeenStore(path, lookback_hours=24, now=_dt(), scope=scope)
+    assert list(store.filter([item])) == []
+    store.close()
+
+
+def test_save_returns_rendered_items(tmp_path: Path) -> None:
+    snippets = [
+        {"date": _dt(), "keyword": "alpha", "url": f"u{i}", "snippet": "alpha " * i + f"#{i}"}
+        for i in range(5)
+    ]
+
+    rendered = storage.save(
+        snippets,
+        str(tmp_path),
+        lookback_hours=LOOKBACK_HOURS,
+        max_items=2,
+        include_keywords=["alpha"],
+    )
+
+    assert [item["url"] for item in rendered] == ["u4", "u3"]
+
+
+def test_save_drops_near_duplicate_reposts(tmp_path: Path) -> None:
+    base = (
+        "Binance temporarily suspended withdrawals on the BNB chain after "
+        "a suspected exploit drained funds from a bridge contract earlier today"
+    )
+    repost = base.replace("earlier today", "this morning") + " https://t.me/x"
+    other = "SEC files lawsuit against exchange over unregistered securities offering"
+
+    def snippets():
+        return [
+            {"date": _dt(), "keyword": "exploit", "url": "https://t.me/a/1", "snippet": base},
+            {"date": _dt(), "keyword": "exploit", "url": "https://t.me/b/7", "snippet": repost},
+            {"date": _dt(), "keyword": "lawsuit", "url": "https://t.me/c/3", "snippet": other},
+        ]
+
+    storage.save(
+        snippets(),
+        str(tmp_path / "on"),
+        lookback_hours=LOOKBACK_HOURS,
+        max_items=MAX_ITEMS,
+        near_dup_threshold=storage.NEAR_DUP_THRESHOLD,
+    )
+    content = (tmp_path / "on" / "result.md").read_text(encoding="utf-8")
+    assert "## Items (2)" in content
+    assert "https://t.me/b/7" not in content
+
+    storage.save(snippets(), str(tmp_path / "off"), lookback_hours=LOOKBACK_HOURS, max_items=MAX_ITEMS)
+    content = (tmp_path / "off" / "result.md").read_text(encoding="utf-8")
+    assert "## Items (3)" in content
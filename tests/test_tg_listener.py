@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from src import tg_listener
+from src.tg_store import TelegramStore
+
+
+class FakeClient:
+    """
+    Stand-in for TelegramClient updates: remembers the NewMessage handler
+    and stays "connected" until disconnect() is called.
+    """
+
+    def __init__(self, peer_ids: dict):
+        self.handlers: list = []
+        self.peer_ids = peer_ids
+        self._disconnected = asyncio.Event()
+
+    async def get_peer_id(self, channel: str) -> int:
+        return self.peer_ids[channel]
+
+    def add_event_handler(self, callback, event):
+        self.handlers.append((callback, event))
+
+    async def run_until_disconnected(self):
+        await self._disconnected.wait()
+
+    def disconnect(self):
+        self._disconnected.set()
+
+    async def emit(self, chat_id: int, msg_id: int, text: str):
+        message = SimpleNamespace(id=msg_id, date=datetime.now(timezone.utc), message=text)
+        event = SimpleNamespace(message=message, chat_id=chat_id)
+        for callback, _ in self.handlers:
+            await callback(event)
+
+
+def test_listener_feeds_new_messages_and_refreshes_on_debounce(monkeypatch, tmp_path):
+    statuses: list = []
+    monkeypatch.setattr(tg_listener, "mark_running", lambda result_path=None: "started")
+    monkeypatch.setattr(tg_listener, "write_status", lambda **kw: statuses.append(kw))
+
+    store = TelegramStore(tmp_path / "telegram.sqlite3")
+    store.add_messages(
+        "news", [(1, datetime.now(timezone.utc) - timedelta(hours=1), "Earlier BTC post")]
+    )
+    # Updates are matched by chat id, whatever the chat's username casing.
+    client = FakeClient({"news": -1001})
+    listener = tg_listener.LiveListener(
+        client,
+        channels=["@news"],
+        keywords=["btc"],
+        lookback_hours=24,
+        max_items=10,
+        store=store,
+        output_dir=str(tmp_path / "output"),
+        debounce_seconds=0.05,
+    )
+
+    async def scenario():
+        task = asyncio.ensure_future(listener.run())
+        await asyncio.sleep(0)
+        assert client.handlers[0][1].chats == ["news"]
+
+        await client.emit(-1001, 2, "BTC breaks out")
+        await client.emit(-1001, 3, "weather report")
+        await client.emit(-1001, 4, "btc again")
+        await client.emit(-1002, 5, "btc in an unrelated chat")
+        assert listener.stats["flushes"] == 1
+
+        await asyncio.sleep(0.15)
+        client.disconnect()
+        await task
+
+    asyncio.run(scenario())
+
+    result = (tmp_path / "output" / "result.md").read_text(encoding="utf-8")
+    assert "BTC breaks out" in result and "btc again" in result and "Earlier BTC post" in result
+    assert "weather" not in result and "unrelated" not in result
+    assert "https://t.me/news/2" in result
+    assert listener.stats == {"live_messages": 3, "matched": 3, "snippets": 3, "flushes": 2}
+    assert [s["state"] for s in statuses] == ["listening", "listening"]
+    stored = store.messages("news", since=datetime.now(timezone.utc) - timedelta(days=1), limit=10)
+    assert [msg_id for msg_id, _, _ in stored] == [4, 3, 2, 1]
+    store.close()
+
+
+def test_flush_evicts_with_the_configured_cache_ttl(monkeypatch, tmp_path):
+    monkeypatch.setattr(tg_listener, "write_status", lambda **kw: None)
+    store = TelegramStore(tmp_path / "telegram.sqlite3")
+    old = datetime.now(timezone.utc) - timedelta(hours=240)
+    store.add_messages("news", [(1, old, "ten days old")])
+    listener = tg_listener.LiveListener(
+        FakeClient({}),
+        channels=["@news"],
+        keywords=["btc"],
+        lookback_hours=24,
+        max_items=10,
+        store=store,
+        output_dir=str(tmp_path / "output"),
+        cache_ttl_hours=300,
+    )
+
+    listener.flush()
+
+    assert [msg_id for msg_id, _, _ in store.messages("news", since=old, limit=10)] == [1]
+    store.close()
@@ -0,0 +1,377 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+from telethon.errors import ChannelInvalidError, FloodWaitError, RPCError
+from telethon.tl.types import InputPeerChannel
+
+from src import tg_reader
+from src.tg_store import EntityCache
+
+
+NOW = datetime(2025, 12, 26, 12, 0, tzinfo=timezone.utc)
+
+
+def _msg(msg_id: int, hours_ago: float, text: str = "post") -> SimpleNamespace:
+    return SimpleNamespace(id=msg_id, date=NOW - timedelta(hours=hours_ago), message=text)
+
+
+class FakeClient:
+    """
+    Async stand-in for TelegramClient: serves GetHistoryRequest from
+    per-channel message lists (newest first) and records concurrency.
+    """
+
+    def __init__(
+        self,
+        history: dict,
+        *,
+        delay: float = 0.01,
+        errors: dict | None = None,
+        entities: dict | None = None,
+    ):
+        self.history = history
+        self.delay = delay
+        self.errors = errors or {}
+        self.entities = entities or {}
+        self.resolved: list = []
+        self.requests: list = []
+        self.active = 0
+        self.max_active = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    async def get_input_entity(self, username):
+        self.resolved.append(username)
+        return self.entities[username]
+
+    async def __call__(self, request):
+        self.requests.append(request)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            peer = request.peer
+            if not isinstance(peer, str):
+                names = [name for name, entity in self.entities.items() if entity == peer]
+                if not names:
+                    raise ChannelInvalidError(None)
+                peer = names[0]
+            error = self.errors.get(peer)
+            if isinstance(error, list):
+                error = error.pop(0) if error else None
+            if error is not None:
+                raise error
+            messages = self.history.get(peer, [])
+            if request.offset_id:
+                messages = [m for m in messages if m.id < request.offset_id]
+            if request.min_id:
+                messages = [m for m in messages if m.id > request.min_id]
+            if hasattr(request, "q"):
+                messages = [
+                    m
+                    for m in messages
+                    if request.q.lower() in m.message.lower() and m.date >= request.min_date
+                ]
+            return SimpleNamespace(messages=messages[: request.limit])
+        finally:
+            self.active -= 1
+
+
+def test_channels_are_fetched_concurrently_in_channel_order(monkeypatch):
+    history = {f"ch{i}": [_msg(10 + i, 1, f"text {i}")] for i in range(6)}
+    client = FakeClient(history)
+    monkeypatch.setattr(tg_reader, "_get_client", lambda *_: client)
+
+    messages = tg_reader.read_messages(
+        channels=[f"@ch{i}" for i in range(6)],
+        since=NOW - timedelta(hours=24),
+        limit_per_channel=50,
+        concurrency=3,
+    )
+
+    assert [m["url"] for m in messages] == [f"https://t.me/ch{i}/{10 + i}" for i in range(6)]
+    assert client.max_active == 3
+
+
+def test_failing_channels_degrade_gracefully(monkeypatch):
+    history = {"ok": [_msg(1, 1), _msg(2, 48)]}
+    client = FakeClient(
+        history,
+        errors={"private": RPCError(None, "CHANNEL_PRIVATE"), "busy": FloodWaitError(None, 30)},
+    )
+    monkeypatch.setattr(tg_reader, "_get_client", lambda *_: client)
+
+    report: dict = {}
+    messages = tg_reader.read_messages(
+        channels=["private", "busy", "ok"],
+        since=NOW - timedelta(hours=24),
+        limit_per_channel=50,
+        deadline_seconds=5,
+        report=report,
+    )
+
+    assert [m["url"] for m in messages] == ["https://t.me/ok/1"]
+    assert report["deferred"] == [] and report["dropped"] == ["busy"]
+
+
+def test_flood_wait_defers_channel_and_retries_after_the_wait(monkeypatch):
+    history = {"busy": [_msg(1, 1, "late")], "ok": [_msg(2, 1, "on time")]}
+    client = FakeClient(history, errors={"busy": [FloodWaitError(None, 0.05)]})
+    monkeypatch.setattr(tg_reader, "_get_client", lambda *_: client)
+
+    report: dict = {}
+    messages = tg_reader.read_messages(
+        channels=["busy", "ok"],
+        since=NOW - timedelta(hours=24),
+        concurrency=1,
+        report=report,
+    )
+
+    assert [m["text"] for m in messages] == ["late", "on time"]
+    assert [r.peer for r in client.requests] == ["busy", "ok", "busy"]
+    assert report["deferred"] == ["busy"] and report["dropped"] == []
+
+
+def test_deferred_channel_does_not_hold_later_sources_past_the_deadline(monkeypatch, tmp_path):
+    import time
+
+    from src import main
+
+    flood = [FloodWaitError(None, 0.6) for _ in range(5)]
+    client = FakeClient({"busy": [_msg(1, 1)]}, errors={"busy": flood})
+    monkeypatch.setattr(tg_reader, "_get_client", lambda *_: client)
+    monkeypatch.setattr(main, "TELEGRAM_STATE_PATH", tmp_path / "telegram.sqlite3")
+    monkeypatch.setattr(main, "ENTITY_CACHE_PATH", None)
+    monkeypatch.setattr(main, "iter_site_items", lambda **kw: iter([{"text": "web item"}]))
+
+    report = {"deferred": [], "dropped": [], "sessions": {}}
+    sources = [
+        {"type": "telegram", "channels": ["busy"], "deadline_seconds": 1},
+        {"type": "web", "sites": ["3dnews"]},
+    ]
+    started = time.monotonic()
+    items = list(main._iter_items_from_sources(sources, NOW - timedelta(hours=24), 24, report))
+
+    assert time.monotonic() - started < 1.5
+    assert items == [{"text": "web item"}]
+    assert report["deferred"] == ["busy"] and report["dropped"] == ["busy"]
+
+
+def test_history_is_paginated_until_lookback_boundary(monkeypatch):
+    history = {"busy": [_msg(1000 - i, i * 0.1) for i in range(300)]}
+    client = FakeClient(history, delay=0)
+    monkeypatch.setattr(tg_reader, "_get_client", lambda *_: client)
+
+    messages = tg_reader.read_messages(
+        channels=["busy"],
+        since=NOW - timedelta(hours=24),
+        limit_per_channel=1000,
+    )
+
+    assert len(messages) == 241
+    assert [r.offset_id for r in client.requests] == [0, 901, 801]
+    assert all(r.limit == 100 for r in client.requests)
+
+
+def test_history_pagination_respects_limit_per_channel(monkeypatch):
+    history = {"busy": [_msg(1000 - i, i * 0.01) for i in range(300)]}
+    client = FakeClient(history, delay=0)
+    monkeypatch.setattr(tg_reader, "_get_client", lambda *_: client)
+
+    messages = tg_reader.read_messages(
+        channels=["busy"],
+        since=NOW - timedelta(hours=24),
+        limit_per_channel=150,
+    )
+
+    assert len(messages) == 150
+    assert [(r.offset_id, r.limit) for r in client.requests] == [(0, 100), (901, 50)]
+
+
+def test_state_path_fetches_only_messages_above_watermark(monkeypatch, tmp_path):
+    state_path = tmp_path / "telegram.sqlite3"
+    since = NOW - timedelta(hours=24)
+    client = FakeClient({"ch": [_msg(3, 2, "third"), _msg(2, 5, "second"), _msg(1, 30, "old")]})
+    monkeypatch.setattr(tg_reader, "_get_client", lambda *_: client)
+
+    first = tg_reader.read_messages(channels=["ch"], since=since, state_path=state_path)
+    assert [m["text"] for m in first] == ["third", "second"]
+    assert client.requests[0].min_id == 0
+
+    client = FakeClient({"ch": [_msg(5, 0.5, "fifth"), _msg(4, 1, "fourth"), _msg(3, 2, "third")]})
+    monkeypatch.setattr(tg_reader, "_get_client", lambda *_: client)
+
+    second = tg_reader.read_messages(channels=["ch"], since=since, state_path=state_path)
+
+    assert [m["text"] for m in second] == ["fifth", "fourth", "third", "second"]
+    assert [m["url"] for m in second][0] == "https://t.me/ch/5"
+    assert [r.min_id for r in client.requests] == [3]
+
+
+def test_repeat_lookback_is_served_from_cache_without_network(monkeypatch, tmp_path):
+    state_path = tmp_path / "telegram.sqlite3"
+    since = NOW - timedelta(hours=24)
+    client = FakeClient({"ch": [_msg(2, 1, "second"), _msg(1, 5, "first")]})
+    monkeypatch.setattr(tg_reader, "_get_client", lambda *_: client)
+
+    first = tg_reader.read_messages(channels=["ch"], since=since, state_path=state_path)
+    again = tg_reader.read_messages(
+        channels=["ch"], since=since, state_path=state_path, cache_max_age_minutes=60
+    )
+
+    assert [m["url"] for m in again] == [m["url"] for m in first]
+    assert len(client.requests) == 1
+
+
+def test_longer_lookback_fetches_only_the_missing_older_range(monkeypatch, tmp_path):
+    state_path = tmp_path / "telegram.sqlite3"
+    history = {"ch": [_msg(4, 1, "d"), _msg(3, 10, "c"), _msg(2, 30, "b"), _msg(1, 60, "a")]}
+    client = FakeClient(history)
+    monkeypatch.setattr(tg_reader, "_get_client", lambda *_: client)
+
+    tg_reader.read_messages(channels=["ch"], since=NOW - timedelta(hours=24), state_path=state_path)
+    client.requests.clear()
+    messages = tg_reader.read_messages(
+        channels=["ch"], since=NOW - timedelta(hours=48), state_path=state_path
+    )
+
+    assert [m["text"] for m in messages] == ["d", "c", "b"]
+    newer, older = client.requests
+    assert newer.min_id == 4
+    assert older.min_id == 0 and older.offset_date == NOW - timedelta(hours=24)
+
+
+def test_shorter_lookback_keeps_the_range_above_the_cursor_contiguous(monkeypatch, tmp_path):
+    # TTL far beyond the fixed NOW, so eviction never narrows the coverage here
+    cached = {"state_path": tmp_path / "telegram.sqlite3", "cache_ttl_hours": 10**6}
+    client = FakeClient({"ch": [_msg(2, 30, "2"), _msg(1, 40, "1")]})
+    monkeypatch.setattr(tg_reader, "_get_client", lambda *_: client)
+    tg_reader.read_messages(channels=["ch"], since=NOW - timedelta(hours=48), **cached)
+
+    client.history["ch"] = [_msg(5, 1, "5"), _msg(4, 2, "4"), _msg(3, 20, "3")] + client.history["ch"]
+    short = tg_reader.read_messages(channels=["ch"], since=NOW - timedelta(hours=15), **cached)
+    assert [m["text"] for m in short] == ["5", "4"]
+
+    client.requests.clear()
+    full = tg_reader.read_messages(
+        channels=["ch"], since=NOW - timedelta(hours=48), cache_max_age_minutes=60, **cached
+    )
+    assert [m["text"] for m in full] == ["5", "4", "3", "2", "1"]
+    assert client.requests == []
+
+
+def test_entity_cache_resolves_each_username_once(monkeypatch, tmp_path):
+    cache_path = tmp_path / "session.entities.sqlite3"
+    entities = {"ch": InputPeerChannel(channel_id=101, access_hash=555)}
+    since = NOW - timedelta(hours=24)
+
+    for _ in range(2):
+        client = FakeClient({"ch": [_msg(1, 1, "post")]}, entities=dict(entities))
+        monkeypatch.setattr(tg_reader, "_get_client", lambda *_: client)
+        messages = tg_reader.read_messages(
+            channels=["@ch"], since=since, entity_cache_path=cache_path
+        )
+        assert [m["url"] for m in messages] == ["https://t.me/ch/1"]
+        assert client.requests[0].peer == entities["ch"]
+
+    assert client.resolved == []
+
+
+def test_entity_cache_entry_is_replaced_when_server_rejects_it(monkeypatch, tmp_path):
+    cache_path = tmp_path / "session.entities.sqlite3"
+    since = NOW - timedelta(hours=24)
+    client = FakeClient({}, entities={"ch": InputPeerChannel(channel_id=101, access_hash=1)})
+    monkeypatch.setattr(tg_reader, "_get_client", lambda *_: client)
+    tg_reader.read_messages(channels=["ch"], since=since, entity_cache_path=cache_path)
+
+    fresh = InputPeerChannel(channel_id=101, access_hash=2)
+    client = FakeClient({"ch": [_msg(1, 1, "post")]}, entities={"ch": fresh})
+    monkeypatch.setattr(tg_reader, "_get_client", lambda *_: client)
+    messages = tg_reader.read_messages(channels=["ch"], since=since, entity_cache_path=cache_path)
+
+    assert [m["text"] for m in messages] == ["post"]
+    assert client.resolved == ["ch"]
+    assert client.requests[-1].peer == fresh
+
+
+def test_search_mode_unions_keyword_searches_by_message_id(monkeypatch):
+    history = {
+        "ch": [
+            _msg(5, 1, "BTC and ETH"),
+            _msg(4, 2, "weather"),
+            _msg(3, 3, "eth only"),
+            _msg(2, 4, "btc only"),
+            _msg(1, 30, "btc, too old"),
+        ]
+    }
+    client = FakeClient(history)
+    monkeypatch.setattr(tg_reader, "_get_client", lambda *_: client)
+
+    messages = tg_reader.read_messages(
+        channels=["ch"],
+        since=NOW - timedelta(hours=24),
+        mode="search",
+        keywords=["btc", "eth"],
+    )
+
+    assert [m["url"] for m in messages] == [f"https://t.me/ch/{i}" for i in (5, 3, 2)]
+    assert [r.q for r in client.requests] == ["btc", "eth"]
+    assert all(r.min_date == NOW - timedelta(hours=24) for r in client.requests)
+
+
+def test_session_pool_shards_channels_and_rebalances_on_flood_wait(monkeypatch):
+    history = {f"c{i}": [_msg(i + 1, 1, f"post {i}")] for i in range(4)}
+    clients = {
+        "acc_a": FakeClient(history, errors={"c0": [FloodWaitError(None, 60)]}),
+        "acc_b": FakeClient(history),
+    }
+    monkeypatch.setattr(tg_reader, "_get_client", lambda path: clients[path])
+
+    report: dict = {}
+    messages = tg_reader.read_messages(
+        channels=["c0", "c1", "c2", "c3"],
+        since=NOW - timedelta(hours=24),
+        sessions=["acc_a", "acc_b"],
+        report=report,
+    )
+
+    assert [m["text"] for m in messages] == [f"post {i}" for i in range(4)]
+    assert [r.peer for r in clients["acc_a"].requests] == ["c0", "c2"]
+    assert sorted(r.peer for r in clients["acc_b"].requests) == ["c0", "c1", "c3"]
+    assert report["sessions"] == {str(Path("acc_a").resolve()): 2, str(Path("acc_b").resolve()): 3}
+    assert report["deferred"] == [] and report["dropped"] == []
+
+
+def test_sessions_with_the_same_basename_are_separate_accounts(monkeypatch, tmp_path):
+    entity_cache_path = tmp_path / "entities.sqlite3"
+    history = {"c0": [_msg(1, 1)], "c1": [_msg(2, 1)]}
+    entities = {"c0": InputPeerChannel(10, 100), "c1": InputPeerChannel(11, 111)}
+    paths = [str(tmp_path / "a" / "main"), str(tmp_path / "b" / "main")]
+    clients = {path: FakeClient(history, entities=entities) for path in paths}
+    monkeypatch.setattr(tg_reader, "_get_client", lambda path: clients[path])
+
+    report: dict = {}
+    tg_reader.read_messages(
+        channels=["c0", "c1"],
+        since=NOW - timedelta(hours=24),
+        sessions=paths,
+        entity_cache_path=entity_cache_path,
+        report=report,
+    )
+
+    key_a, key_b = (str(Path(path).resolve()) for path in paths)
+    assert report["sessions"] == {key_a: 2, key_b: 2}
+    cache_a = EntityCache(entity_cache_path, scope=key_a)
+    cache_b = EntityCache(entity_cache_path, scope=key_b)
+    assert (cache_a.get("c0"), cache_a.get("c1")) == ((10, 100), None)
+    assert (cache_b.get("c0"), cache_b.get("c1")) == (None, (11, 111))
+    cache_a.close()
+    cache_b.close()
@@ -1,6 +1,10 @@
 from datetime import datetime, timezone
+import os
+import threading
+import time
 
 import src.web_reader as wr
+from src.web_store import ArticleCache
 
 
 RSS_SAMPLE = """<?xml version="1.0" encoding="UTF-8"?>
@@ -122,3 +126,201 @@ def test_read_site_items_filters_by_lookback(monkeypatch):
 
     assert len(items) == 1
     assert items[0]["url"] == "https://3dnews.ru/111111/"
+
+
+def _rss_with_items(count: int) -> str:
+    return _rss_feed(range(count))
+
+
+def _rss_feed(minutes) -> str:
+    """Feed with one item per minute offset, in the given order."""
+    items = "".join(
+        f"""
+    <item>
+      <title>Item {i}</title>
+      <link>https://3dnews.ru/{i}/</link>
+      <pubDate>Fri, 26 Dec 2025 10:{i:02d}:00 +0000</pubDate>
+      <description>summary {i}</description>
+    </item>"""
+        for i in minutes
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel>{items}</channel></rss>'
+
+
+def test_articles_are_fetched_concurrently_in_feed_order(monkeypatch):
+    lock = threading.Lock()
+    active = {"now": 0, "max": 0}
+
+    def fake_fetch(url: str, timeout_seconds: int = 20) -> str:
+        if url.endswith("/rss"):
+            return _rss_with_items(6)
+        with lock:
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        # later items finish first
+        time.sleep(0.02 * (6 - int(url.rstrip("/").rsplit("/", 1)[1])))
+        with lock:
+            active["now"] -= 1
+        return ARTICLE_HTML.replace("DDR5 memory", url)
+
+    monkeypatch.setattr(wr, "fetch_url", fake_fetch)
+
+    items = wr.read_site_items(
+        site="3dnews.ru",
+        lookback_hours=24,
+        now=datetime(2025, 12, 26, 12, 0, tzinfo=timezone.utc),
+        max_workers=6,
+        per_host_limit=3,
+    )
+
+    assert [it["url"] for it in items] == [f"https://3dnews.ru/{i}/" for i in range(6)]
+    assert all(it["url"] in it["text"] for it in items)
+    assert active["max"] == 3
+
+
+def test_articles_past_site_deadline_keep_rss_summary(monkeypatch):
+    def fake_fetch(url: str, timeout_seconds: int = 20) -> str:
+        if url.endswith("/rss"):
+            return _rss_with_items(3)
+        if url.endswith("/1/"):
+            time.sleep(0.5)
+        return ARTICLE_HTML
+
+    monkeypatch.setattr(wr, "fetch_url", fake_fetch)
+
+    items = wr.read_site_items(
+        site="3dnews.ru",
+        lookback_hours=24,
+        now=datetime(2025, 12, 26, 12, 0, tzinfo=timezone.utc),
+        deadline_seconds=0.2,
+    )
+
+    assert [it["url"] for it in items] == [f"https://3dnews.ru/{i}/" for i in range(3)]
+    assert items[1]["text"] == "summary 1"
+    assert "DDR5 memory price" in items[0]["text"] and "DDR5 memory price" in items[2]["text"]
+
+
+def test_feed_is_fetched_conditionally_and_304_reuses_parsed_items(monkeypatch, tmp_path):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            requests.append((self.path, self.headers.get("If-None-Match")))
+            if self.path == "/rss" and self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = (_rss_with_items(2) if self.path == "/rss" else "<html></html>").encode()
+            self.send_response(200)
+            if self.path == "/rss":
+                self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+    feed_url = f"http://127.0.0.1:{httpd.server_address[1]}/rss"
+    monkeypatch.setitem(wr._SITE_FEEDS, "example.test", feed_url)
+    monkeypatch.setattr(wr, "fetch_url", lambda url, timeout_seconds=20: "<html></html>")
+
+    parsed = []
+    real_iter_rss = wr.iter_rss
+    monkeypatch.setattr(wr, "iter_rss", lambda *a, **kw: parsed.append(a) or real_iter_rss(*a, **kw))
+
+    def read():
+        return wr.read_site_items(
+            site="example.test",
+            lookback_hours=24,
+            now=datetime(2025, 12, 26, 12, 0, tzinfo=timezone.utc),
+            state_path=tmp_path / "web.sqlite3",
+        )
+
+    try:
+        first = read()
+        second = read()
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+    assert second == first
+    assert [it["text"] for it in first] == ["summary 0", "summary 1"]
+    assert len(parsed) == 1
+    assert requests == [("/rss", None), ("/rss", '"v1"')]
+
+
+def test_article_text_is_served_from_disk_cache(monkeypatch, tmp_path):
+    fetched = []
+
+    def fake_fetch(url: str, timeout_seconds: int = 20) -> str:
+        if url.endswith("/rss"):
+            return _rss_with_items(2)
+        fetched.append(url)
+        return ARTICLE_HTML
+
+    monkeypatch.setattr(wr, "fetch_url", fake_fetch)
+    cache = ArticleCache(tmp_path / "articles")
+
+    def read():
+        return wr.read_site_items(
+            site="3dnews.ru",
+            lookback_hours=24,
+            now=datetime(2025, 12, 26, 12, 0, tzinfo=timezone.utc),
+            article_cache=cache,
+        )
+
+    first = read()
+    second = read()
+
+    assert second == first
+    assert "DDR5 memory price" in first[0]["text"]
+    assert len(fetched) == 2
+    assert cache.counters() == {"hits": 2, "misses": 2, "evictions": 0}
+    assert not any("<div" in p.read_text() for p in (tmp_path / "articles").glob("*/*.txt"))
+
+
+def test_article_cache_expires_entries_and_evicts_least_recently_used(tmp_path):
+    cache = ArticleCache(tmp_path / "articles", ttl_seconds=3600, max_bytes=10)
+    cache.put("https://a/", "aaaa")
+    cache.put("https://b/", "bbbb")
+    time.sleep(0.01)
+    assert cache.get("https://a/") == "aaaa"   # a is now more recent than b
+
+    cache.put("https://c/", "cccc")            # over 10 bytes: evict b
+    assert cache.get("https://b/") is None
+    assert cache.get("https://a/") == "aaaa" and cache.get("https://c/") == "cccc"
+
+    stale = cache._path("https://c/")
+    os.utime(stale, (time.time(), time.time() - 7200))
+    assert cache.get("https://c/") is None and not stale.exists()
+    assert cache.counters() == {"hits": 3, "misses": 2, "evictions": 1}
+
+
+def test_iter_rss_stops_after_consecutive_older_items_on_newest_first_feeds():
+    since = datetime(2025, 12, 26, 10, 7, tzinfo=timezone.utc)
+    newest_first = _rss_feed(range(9, -1, -1))
+
+    # the tail after the stop is never parsed (truncated here on purpose)
+    truncated = newest_first[: newest_first.index("<title>Item 1</title>")]
+    titles = [it["title"] for it in wr.iter_rss(truncated, "s", since=since)]
+    assert titles == [f"Item {i}" for i in range(9, 2, -1)]
+
+    # oldest-first feeds are read to the end; the caller filters by date
+    titles = [it["title"] for it in wr.iter_rss(_rss_with_items(10), "s", since=since)]
+    assert titles == [f"Item {i}" for i in range(10)]
+
+
+def test_iter_rss_keeps_reading_past_an_out_of_order_older_item():
+    since = datetime(2025, 12, 26, 10, 30, tzinfo=timezone.utc)
+    # an updated / pinned older story between fresh ones
+    titles = [it["title"] for it in wr.iter_rss(_rss_feed([59, 1, 58, 57]), "s", since=since)]
+
+    assert titles == ["Item 59", "Item 1", "Item 58", "Item 57"]